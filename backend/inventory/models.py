@@ -1,7 +1,7 @@
 from django.db import models
 from django.core.validators import MinValueValidator
 from django.utils import timezone
-from django.db.models import F
+from django.db.models import F, Q
 from simple_history.models import HistoricalRecords
 import os
 
@@ -110,6 +110,8 @@ class Product(models.Model):
             models.Index(fields=['sku']),
             models.Index(fields=['name']),
             models.Index(fields=['category']),
+            # Partial index for the dashboard/report low-stock probes on active products
+            models.Index(fields=['current_stock'], name='idx_product_active_stock', condition=Q(is_active=True)),
         ]
     
     def __str__(self):
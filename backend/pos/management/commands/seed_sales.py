@@ -1,22 +1,33 @@
 import csv
-from datetime import datetime, timedelta
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone as dt_tz
 from django.core.management.base import BaseCommand
 from django.db import transaction, connection
 from django.utils import timezone 
 from decimal import Decimal
+from functools import lru_cache
 import sys
 import random
-import pytz
 
 # --- Import your models ---
 from inventory.models import Product 
 from pos.models import SalesTransaction, TransactionItem 
+from reports.models import DashboardMetric
 try:
     from accounts.models import User
 except ImportError:
     User = None
 
 
+ZERO = Decimal('0.00')
+
+
+@lru_cache(maxsize=4096)
+def _dec(value):
+    """Parse a CSV money string once; the dataset reuses a small set of prices/totals"""
+    return Decimal(value)
+
+
 class Command(BaseCommand):
     help = 'Seeds sales data from flowerbelle_sales_dataset.csv into SalesTransaction and TransactionItem models for a 90-day period.'
 
@@ -56,14 +67,55 @@ class Command(BaseCommand):
             normalized = normalized.replace(variant, "'")
         return normalized
 
+    @staticmethod
+    @contextmanager
+    def disable_auto_timestamps(model):
+        """Temporarily turn off auto_now/auto_now_add so explicit timestamps are saved as-is"""
+        toggled = []
+        for field in model._meta.get_fields():
+            for flag in ('auto_now', 'auto_now_add'):
+                if getattr(field, flag, False):
+                    setattr(field, flag, False)
+                    toggled.append((field, flag))
+        try:
+            yield
+        finally:
+            for field, flag in toggled:
+                setattr(field, flag, True)
+
+    @staticmethod
+    def rebuild_dashboard_metrics(start_date):
+        """Rebuild every stored or seeded DashboardMetric day up to yesterday"""
+        # The dashboard reads closed days from DashboardMetric, and the delete/TRUNCATE and
+        # bulk_create() here skip SalesTransaction.save(), which would otherwise refresh them
+        end_date = timezone.localdate() - timedelta(days=1)
+        earliest_metric = DashboardMetric.objects.order_by('date').values_list('date', flat=True).first()
+        if earliest_metric:
+            start_date = min(earliest_metric, start_date)
+        if start_date <= end_date:
+            DashboardMetric.generate_for_range(start_date, end_date)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--truncate',
+            action='store_true',
+            help='Clear existing sales with TRUNCATE ... CASCADE (PostgreSQL only) instead of an ORM delete.',
+        )
+
     def handle(self, *args, **kwargs):
         self.stdout.write(self.style.NOTICE("Starting Sales Transaction data seeding to live database..."))
         
+        # Local generator: avoids the module-level lock and makes seed runs reproducible
+        rng = random.Random(42)
+        
         # 1. Validation and Setup
         try:
             # Get default user for transactions
-            default_user = User.objects.filter(is_superuser=True).first() or User.objects.first()
-            if not default_user:
+            default_user_id = (
+                User.objects.filter(is_superuser=True).values_list('id', flat=True).first()
+                or User.objects.values_list('id', flat=True).first()
+            )
+            if not default_user_id:
                 self.stdout.write(self.style.ERROR("\nError: No users found. Cannot create sales transactions."))
                 sys.exit(1)
         except Exception:
@@ -83,9 +135,16 @@ class Command(BaseCommand):
         self.stdout.write(self.style.NOTICE(f"📅 To recent dates: {start_date} to {end_date}"))
         
         # 2. Clear ALL existing Sales Transactions
-        deleted_count = SalesTransaction.objects.all().count()
-        SalesTransaction.objects.all().delete()
-        self.stdout.write(self.style.WARNING(f"Cleared {deleted_count} existing sales transactions and related items."))
+        if kwargs.get('truncate') and connection.vendor == 'postgresql':
+            # TRUNCATE skips per-row cascade collection and signals entirely
+            quote_name = connection.ops.quote_name
+            tables = ', '.join(quote_name(model._meta.db_table) for model in (SalesTransaction, TransactionItem))
+            with connection.cursor() as cursor:
+                cursor.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+            self.stdout.write(self.style.WARNING("Truncated existing sales transactions and related items."))
+        else:
+            deleted_count, _ = SalesTransaction.objects.all().delete()
+            self.stdout.write(self.style.WARNING(f"Cleared {deleted_count} existing sales transactions and related items."))
         
         # 3. Read CSV data and create date mapping
         data_to_load = {}
@@ -120,6 +179,7 @@ class Command(BaseCommand):
             self.stdout.write(self.style.NOTICE(f"\nLoaded {len(data_to_load)} days of data from CSV"))
             if not data_to_load:
                  self.stdout.write(self.style.ERROR("No data found in the CSV."))
+                 self.rebuild_dashboard_metrics(start_date)
                  return
             
             # Create date mapping: CSV date -> Recent date
@@ -134,102 +194,88 @@ class Command(BaseCommand):
 
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f"Error: {csv_file_path} not found. Ensure it is in the backend directory."))
+            self.rebuild_dashboard_metrics(start_date)
             return
         
-        # 4. Process grouped data
-        transaction_count = 0
-        item_count = 0
+        # 4. Build grouped data in memory (pure Python, no writes yet)
+        sales_txns = []
+        transaction_items = []
         
-        # Get the actual database table name from the model
-        table_name = SalesTransaction._meta.db_table
-        self.stdout.write(self.style.NOTICE(f"Using table: {table_name}"))
+        # Resolve which mapped products actually exist with a single query
+        valid_product_ids = set(
+            Product.objects.filter(id__in=set(self.PRODUCT_ID_MAP.values())).values_list('id', flat=True)
+        )
         
-        with transaction.atomic():
-            # Sort the keys to ensure chronological creation
-            for csv_date_str in sorted(data_to_load.keys()):
-                daily_items = data_to_load[csv_date_str]
-                
-                # Get the mapped recent date
-                mapped_date = date_mapping[csv_date_str]
-                
-                subtotal = sum(Decimal(item['total_sales']) for item in daily_items)
-                total_amount = subtotal
-                
-                # Create timezone-aware datetime using the MAPPED recent date
-                naive_datetime = datetime.combine(mapped_date, datetime.min.time())
-                # Add random hour between 9 AM and 6 PM for more realistic data
-                naive_datetime = naive_datetime.replace(
-                    hour=random.randint(9, 18),
-                    minute=random.randint(0, 59),
-                    second=random.randint(0, 59)
-                )
-                
-                # Convert to timezone-aware datetime in UTC
-                utc = pytz.UTC
-                sale_datetime = utc.localize(naive_datetime)
+        # Sort the keys to ensure chronological creation
+        for csv_date_str in sorted(data_to_load.keys()):
+            daily_items = data_to_load[csv_date_str]
+            
+            # Get the mapped recent date
+            mapped_date = date_mapping[csv_date_str]
+            
+            subtotal = sum(_dec(item['total_sales']) for item in daily_items)
+            total_amount = subtotal
+            
+            # Create timezone-aware (UTC) datetime using the MAPPED recent date,
+            # with a random hour between 9 AM and 6 PM for more realistic data
+            sale_datetime = datetime(
+                mapped_date.year, mapped_date.month, mapped_date.day,
+                rng.randint(9, 18), rng.randint(0, 59), rng.randint(0, 59),
+                tzinfo=dt_tz.utc
+            )
 
-                # Create the main SalesTransaction using save() to control timestamps
-                sales_txn = SalesTransaction(
-                    subtotal=subtotal,
-                    tax=Decimal('0.00'),
-                    discount=Decimal('0.00'),
-                    total_amount=total_amount,
-                    payment_method='CARD', 
-                    payment_reference=f'SEED-{mapped_date}-{random.randint(1000, 9999)}',
-                    amount_paid=total_amount,
-                    status='COMPLETED',
-                    created_by=default_user,
-                )
-                
-                # Save without triggering auto_now_add by directly setting the field
-                sales_txn.save()
+            # bulk_create() bypasses SalesTransaction.save(), so the transaction
+            # number is assigned here (one seeded transaction per day)
+            sales_txn = SalesTransaction(
+                transaction_number=f"TXN-{mapped_date.strftime('%Y%m%d')}-0001",
+                subtotal=subtotal,
+                tax=ZERO,
+                discount=ZERO,
+                total_amount=total_amount,
+                payment_method='CARD', 
+                payment_reference='SEED-' + mapped_date.isoformat() + '-' + str(rng.randint(1000, 9999)),
+                amount_paid=total_amount,
+                status='COMPLETED',
+                created_by_id=default_user_id,
+                created_at=sale_datetime,
+                updated_at=sale_datetime,
+                completed_at=sale_datetime,
+            )
+            sales_txns.append(sales_txn)
+            
+            # Build related TransactionItems
+            for item in daily_items:
+                product_name = item['product'].strip()
+                # Normalize the product name to handle apostrophe variants
+                normalized_name = self.normalize_product_name(product_name)
+                product_id = self.PRODUCT_ID_MAP.get(normalized_name)
                 
-                # Now update the timestamps using raw SQL to bypass Django's auto fields
-                with connection.cursor() as cursor:
-                    cursor.execute(
-                        f"""
-                        UPDATE {table_name} 
-                        SET created_at = %s, completed_at = %s, updated_at = %s
-                        WHERE id = %s
-                        """,
-                        [sale_datetime, sale_datetime, sale_datetime, sales_txn.id]
-                    )
+                if not product_id:
+                    self.stdout.write(self.style.ERROR(f"Skipping row: Missing ID for product '{product_name}' (normalized: '{normalized_name}') on {csv_date_str} -> {mapped_date}."))
+                    continue
                 
-                transaction_count += 1
+                if product_id not in valid_product_ids:
+                    self.stdout.write(self.style.ERROR(f"Product ID {product_id} not found for '{product_name}'"))
+                    continue
                 
-                # Create related TransactionItems
-                for item in daily_items:
-                    product_name = item['product'].strip()
-                    # Normalize the product name to handle apostrophe variants
-                    normalized_name = self.normalize_product_name(product_name)
-                    product_id = self.PRODUCT_ID_MAP.get(normalized_name)
-                    
-                    if not product_id:
-                        self.stdout.write(self.style.ERROR(f"Skipping row: Missing ID for product '{product_name}' (normalized: '{normalized_name}') on {csv_date_str} -> {mapped_date}."))
-                        continue
-                    
-                    try:
-                        # Verify product exists
-                        Product.objects.get(id=product_id)
-                        
-                        # Create the TransactionItem
-                        TransactionItem.objects.create(
-                            transaction=sales_txn,
-                            product_id=product_id,
-                            quantity=int(item['quantity_sold']),
-                            unit_price=Decimal(item['price']),
-                            discount=Decimal('0.00'),
-                            line_total=Decimal(item['total_sales'])
-                        )
-                        item_count += 1
-                        
-                    except Product.DoesNotExist:
-                        self.stdout.write(self.style.ERROR(f"Product ID {product_id} not found for '{product_name}'"))
-                        continue
-                    except Exception as e:
-                        self.stdout.write(self.style.ERROR(f"Error creating item: {e}"))
-                        continue
+                transaction_items.append(TransactionItem(
+                    transaction=sales_txn,
+                    product_id=product_id,
+                    quantity=int(item['quantity_sold']),
+                    unit_price=_dec(item['price']),
+                    discount=ZERO,
+                    line_total=_dec(item['total_sales'])
+                ))
+        
+        # 5. Write everything in one short transaction
+        with self.disable_auto_timestamps(SalesTransaction), transaction.atomic():
+            SalesTransaction.objects.bulk_create(sales_txns, batch_size=500)
+            TransactionItem.objects.bulk_create(transaction_items, batch_size=1000)
+        
+        self.rebuild_dashboard_metrics(start_date)
         
+        transaction_count = len(sales_txns)
+        item_count = len(transaction_items)
         self.stdout.write(self.style.SUCCESS(f"\n✅ Sales data seeding completed!"))
         self.stdout.write(self.style.SUCCESS(f"   📅 Date range: {start_date} to {end_date}"))
         self.stdout.write(self.style.SUCCESS(f"   📊 Transactions created: {transaction_count}"))
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-16 09:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0004_add_item_refund_tracking'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salestransaction',
+            index=models.Index(fields=['status', 'created_at'], name='sales_trans_status_3af694_idx'),
+        ),
+    ]
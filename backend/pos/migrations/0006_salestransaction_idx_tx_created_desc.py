@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-16 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0005_salestransaction_status_created_at_idx'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='salestransaction',
+            index=models.Index(fields=['-created_at'], include=['total_amount', 'status', 'payment_method', 'transaction_number'], name='idx_tx_created_desc'),
+        ),
+    ]
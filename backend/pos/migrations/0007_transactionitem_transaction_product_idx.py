@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0006_salestransaction_idx_tx_created_desc'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transactionitem',
+            index=models.Index(fields=['transaction', 'product'], name='transaction_transac_59ec96_idx'),
+        ),
+    ]
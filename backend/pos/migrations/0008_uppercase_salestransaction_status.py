@@ -0,0 +1,21 @@
+# Generated by Django 5.2.7 on 2026-10-16 10:30
+
+from django.db import migrations
+from django.db.models.functions import Upper
+
+
+def uppercase_status(apps, schema_editor):
+    """Normalize legacy mixed-case statuses ('Completed', 'Paid') to the upper-case choice values"""
+    SalesTransaction = apps.get_model('pos', 'SalesTransaction')
+    SalesTransaction.objects.exclude(status=Upper('status')).update(status=Upper('status'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0007_transactionitem_transaction_product_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(uppercase_status, migrations.RunPython.noop),
+    ]
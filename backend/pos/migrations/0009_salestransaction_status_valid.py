@@ -0,0 +1,27 @@
+# Generated by Django 5.2.7 on 2026-10-16 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0008_uppercase_salestransaction_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='historicalsalestransaction',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('COMPLETED', 'Completed'), ('PAID', 'Paid'), ('VOID', 'Void'), ('REFUNDED', 'Refunded')], default='PENDING', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='salestransaction',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('COMPLETED', 'Completed'), ('PAID', 'Paid'), ('VOID', 'Void'), ('REFUNDED', 'Refunded')], default='PENDING', max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='salestransaction',
+            constraint=models.CheckConstraint(condition=models.Q(('status__in', ['PENDING', 'COMPLETED', 'VOID', 'REFUNDED', 'PAID'])), name='sales_transaction_status_valid'),
+        ),
+    ]
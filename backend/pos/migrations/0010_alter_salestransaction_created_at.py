@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-16 11:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pos', '0009_salestransaction_status_valid'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='historicalsalestransaction',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='salestransaction',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -22,6 +22,7 @@ class SalesTransaction(models.Model):
     STATUS_CHOICES = (
         ('PENDING', 'Pending'),
         ('COMPLETED', 'Completed'),
+        ('PAID', 'Paid'),  # legacy imported rows, counted as completed by the reports
         ('VOID', 'Void'),
         ('REFUNDED', 'Refunded'),
     )
@@ -54,7 +55,9 @@ class SalesTransaction(models.Model):
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='sales_transactions')
     # -----------------------------------------------------
 
-    created_at = models.DateTimeField(auto_now_add=True)
+    # default rather than auto_now_add, so imports/backfills can set the sale time explicitly;
+    # editable=False keeps it read-only in forms and the API serializers
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
@@ -75,13 +78,40 @@ class SalesTransaction(models.Model):
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
             models.Index(fields=['created_by']),
+            models.Index(fields=['status', 'created_at']),
+            # Covering index for the "recent transactions" lists (index-only scan on PostgreSQL).
+            # The report exports don't get an index of their own: sales_report aggregates the
+            # items (GROUP BY over the items join, then a sort on -created_at), and its
+            # status + created_at range filter is served by the (status, created_at) index above
+            models.Index(
+                fields=['-created_at'],
+                name='idx_tx_created_desc',
+                include=['total_amount', 'status', 'payment_method', 'transaction_number'],
+            ),
+        ]
+        constraints = [
+            # Statuses are stored upper-case (see save()) and must be one of STATUS_CHOICES
+            models.CheckConstraint(
+                condition=models.Q(status__in=['PENDING', 'COMPLETED', 'VOID', 'REFUNDED', 'PAID']),
+                name='sales_transaction_status_valid',
+            ),
         ]
     
     def __str__(self):
         return f"{self.transaction_number} - ₱{self.total_amount} ({self.get_status_display()})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Remember the stored status so save() can tell when it changes"""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+    
     def save(self, *args, **kwargs):
-        """Generate transaction number if not exists"""
+        """Generate transaction number if not exists and normalize status casing"""
+        if self.status:
+            self.status = self.status.upper()
+        
         if not self.transaction_number:
             today = timezone.now()
             date_str = today.strftime('%Y%m%d')
@@ -99,6 +129,25 @@ class SalesTransaction(models.Model):
             self.transaction_number = f'TXN-{date_str}-{new_number:04d}'
         
         super().save(*args, **kwargs)
+        
+        status_changed = getattr(self, '_loaded_status', self.status) != self.status
+        self._loaded_status = self.status
+        if status_changed:
+            self.refresh_dashboard_metric()
+    
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+        self.refresh_dashboard_metric()
+        return result
+    
+    def refresh_dashboard_metric(self):
+        """Regenerate the stored dashboard metric for this sale's day if it is already closed"""
+        from reports.models import DashboardMetric
+        
+        # Today's figures are computed live; only past days are read from DashboardMetric
+        day = timezone.localdate(self.created_at)
+        if day < timezone.localdate() and DashboardMetric.objects.filter(date=day).exists():
+            DashboardMetric.generate_for_date(day)
     
     @property
     def item_count(self):
@@ -246,6 +295,9 @@ class TransactionItem(models.Model):
         verbose_name = 'Transaction Item'
         verbose_name_plural = 'Transaction Items'
         ordering = ['id']
+        indexes = [
+            models.Index(fields=['transaction', 'product']),
+        ]
     
     def __str__(self):
         return f"{self.product.name} x{self.quantity} - ₱{self.line_total}"
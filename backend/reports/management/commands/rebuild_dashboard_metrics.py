@@ -0,0 +1,28 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from reports.models import DashboardMetric
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds DashboardMetric rows for the last N closed days (run nightly, e.g. from cron).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=35,
+            help='Number of days before today to rebuild (default: 35, enough for the week and month views).',
+        )
+
+    def handle(self, *args, **options):
+        # Today is still changing and is always aggregated live by the dashboard
+        end_date = timezone.localdate() - timedelta(days=1)
+        start_date = end_date - timedelta(days=options['days'] - 1)
+
+        metrics = DashboardMetric.generate_for_range(start_date, end_date)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt {len(metrics)} dashboard metric rows ({start_date} to {end_date})."
+        ))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_historicaldashboardmetric_historicalreportexport_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalreportexport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reportexport',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
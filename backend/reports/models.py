@@ -1,3 +1,4 @@
+from datetime import timedelta
 from django.db import models
 from django.utils import timezone
 from accounts.models import User
@@ -61,6 +62,9 @@ class ReportExport(models.Model):
         ('FAILED', 'Failed'),
     )
     
+    # A PENDING export older than this has lost its worker thread (e.g. the process restarted)
+    STALE_AFTER = timedelta(minutes=15)
+    
     report_type = models.CharField(max_length=50)
     export_format = models.CharField(max_length=10, choices=EXPORT_FORMATS)
     file_path = models.CharField(max_length=500, blank=True)
@@ -77,6 +81,7 @@ class ReportExport(models.Model):
     # Tracking
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='report_exports')
     created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     
     history = HistoricalRecords() # ADDED
@@ -89,11 +94,29 @@ class ReportExport(models.Model):
     
     def __str__(self):
         return f"{self.report_type} - {self.export_format} ({self.get_status_display()})"
+    
+    @property
+    def is_stale(self):
+        """Whether the export is still PENDING long after it was queued or started"""
+        if self.status != 'PENDING':
+            return False
+        return (self.started_at or self.created_at) < timezone.now() - self.STALE_AFTER
+    
+    def fail_if_stale(self):
+        """Mark a stale PENDING export as FAILED so clients stop polling it"""
+        if self.is_stale:
+            self.status = 'FAILED'
+            self.error_message = 'Export did not finish; the background worker stopped. Please request it again.'
+            self.save(update_fields=['status', 'error_message'])
+        return self
 
 
 class DashboardMetric(models.Model):
     """Store dashboard metrics for historical tracking"""
     
+    # Transaction statuses counted as sales on the dashboard
+    SALES_STATUSES = ('COMPLETED', 'PAID', 'PENDING')
+    
     date = models.DateField(unique=True)
     
     # Sales metrics
@@ -130,48 +153,65 @@ class DashboardMetric(models.Model):
     @classmethod
     def generate_for_date(cls, date):
         """Generate metrics for a specific date"""
-        from pos.models import SalesTransaction
+        return cls.generate_for_range(date, date)[0]
+    
+    @classmethod
+    def generate_for_range(cls, start_date, end_date):
+        """Generate metrics for every date in [start_date, end_date] using grouped queries"""
+        from pos.models import SalesTransaction, TransactionItem
         from inventory.models import Product
-        from django.db.models import Sum, Count, F
+        from django.db.models import Sum, Count, F, Q
+        from django.db.models.functions import TruncDate
         
-        # Sales metrics
+        # Sales metrics, one row per local date
         transactions = SalesTransaction.objects.filter(
-            status='COMPLETED',
-            created_at__date=date
+            status__in=cls.SALES_STATUSES,
+            created_at__date__gte=start_date,
+            created_at__date__lte=end_date
+        )
+        sales_by_date = {
+            row['day']: row
+            for row in transactions.annotate(day=TruncDate('created_at')).values('day').annotate(
+                daily_sales=Sum('total_amount'),
+                daily_transactions=Count('id')
+            )
+        }
+        profit_by_date = dict(
+            TransactionItem.objects.filter(transaction__in=transactions)
+            .annotate(day=TruncDate('transaction__created_at')).values('day')
+            .annotate(profit=Sum(F('quantity') * (F('unit_price') - F('product__cost_price'))))
+            .values_list('day', 'profit')
         )
         
-        daily_sales = transactions.aggregate(total=Sum('total_amount'))['total'] or 0
-        daily_transactions = transactions.count()
-        daily_profit = sum(t.profit for t in transactions)
-        
-        # Inventory metrics
-        total_products = Product.objects.filter(is_active=True).count()
-        low_stock_count = Product.objects.filter(
-            current_stock__lte=F('reorder_level'),
-            is_active=True
-        ).count()
-        out_of_stock_count = Product.objects.filter(
-            current_stock=0,
-            is_active=True
-        ).count()
-        inventory_value = Product.objects.filter(is_active=True).aggregate(
-            total=Sum(F('current_stock') * F('cost_price'))
-        )['total'] or 0
+        # Inventory metrics are a snapshot, shared by every newly created date
+        active = Q(is_active=True)
+        inventory = Product.objects.aggregate(
+            total_products=Count('id', filter=active),
+            low_stock_count=Count('id', filter=active & Q(current_stock__lte=F('reorder_level'))),
+            out_of_stock_count=Count('id', filter=active & Q(current_stock=0)),
+            inventory_value=Sum(F('current_stock') * F('cost_price'), filter=active)
+        )
+        inventory['inventory_value'] = inventory['inventory_value'] or 0
         
-        # Customer metrics are not calculated here, remaining fields default to 0
+        metrics = []
+        day = start_date
+        while day <= end_date:
+            sales = sales_by_date.get(day, {})
+            metrics.append(cls(
+                date=day,
+                daily_sales=sales.get('daily_sales') or 0,
+                daily_transactions=sales.get('daily_transactions', 0),
+                daily_profit=profit_by_date.get(day) or 0,
+                **inventory
+            ))
+            day += timedelta(days=1)
         
-        # Create or update metric
-        metric, created = cls.objects.update_or_create(
-            date=date,
-            defaults={
-                'daily_sales': daily_sales,
-                'daily_transactions': daily_transactions,
-                'daily_profit': daily_profit,
-                'total_products': total_products,
-                'low_stock_count': low_stock_count,
-                'out_of_stock_count': out_of_stock_count,
-                'inventory_value': inventory_value,
-            }
+        # Insert new dates and refresh existing ones in a single statement per batch. Only
+        # the sales figures are rewritten on conflict: the inventory snapshot is taken when
+        # a date's row is first created and must keep the stock levels of that day
+        return cls.objects.bulk_create(
+            metrics,
+            update_conflicts=True,
+            unique_fields=['date'],
+            update_fields=['daily_sales', 'daily_transactions', 'daily_profit']
         )
-        
-        return metric
\ No newline at end of file
@@ -1,4 +1,6 @@
+import calendar
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 from .models import ReportSchedule, ReportExport, DashboardMetric
 
 
@@ -168,21 +170,78 @@ class ReportExportSerializer(serializers.ModelSerializer):
     created_by_name = serializers.CharField(source='created_by.full_name', read_only=True)
     export_format_display = serializers.CharField(source='get_export_format_display', read_only=True)
     status_display = serializers.CharField(source='get_status_display', read_only=True)
+    file_url = serializers.SerializerMethodField()
     
     class Meta:
         model = ReportExport
         fields = ('id', 'report_type', 'export_format', 'export_format_display',
-                 'file_path', 'file_size', 'status', 'status_display', 'error_message',
+                 'file_path', 'file_url', 'file_size', 'status', 'status_display', 'error_message',
                  'start_date', 'end_date', 'filters', 'created_by', 'created_by_name',
-                 'created_at', 'completed_at')
+                 'created_at', 'started_at', 'completed_at')
         read_only_fields = ('id', 'file_path', 'file_size', 'status', 'error_message',
-                           'created_by', 'created_at', 'completed_at')
+                           'created_by', 'created_at', 'started_at', 'completed_at')
+    
+    def get_file_url(self, obj):
+        """Authenticated download URL once the background export has written the file"""
+        if obj.status == 'COMPLETED' and obj.file_path:
+            return reverse('reports:export-download', kwargs={'pk': obj.pk}, request=self.context.get('request'))
+        return None
 
 
 class ExportRequestSerializer(serializers.Serializer):
     """Serializer for export requests"""
+    # Weekday name (any case) -> Python weekday number, Monday=0
+    WEEKDAYS = {name.lower(): number for number, name in enumerate(calendar.day_name)}
+    
     report_type = serializers.CharField()
-    export_format = serializers.ChoiceField(choices=['PDF', 'CSV', 'EXCEL'])
+    # Queued exports are rendered by SimpleReportExport, which has no Excel writer
+    export_format = serializers.ChoiceField(choices=['PDF', 'CSV'])
     start_date = serializers.DateField(required=False)
     end_date = serializers.DateField(required=False)
-    filters = serializers.JSONField(required=False)
\ No newline at end of file
+    filters = serializers.JSONField(required=False)
+    
+    def validate_report_type(self, value):
+        """Only report types SimpleReportExport can build (case-insensitive)"""
+        # Imported here: views imports this module
+        from .views import SimpleReportExport
+        
+        report_type = value.lower()
+        if report_type not in SimpleReportExport.REPORT_BUILDERS:
+            choices = ', '.join(SimpleReportExport.REPORT_BUILDERS)
+            raise serializers.ValidationError(f'"{value}" is not a valid choice. Choose one of: {choices}.')
+        return report_type
+    
+    def validate(self, attrs):
+        start_date = attrs.get('start_date')
+        end_date = attrs.get('end_date')
+        if start_date and end_date and start_date > end_date:
+            raise serializers.ValidationError({'end_date': 'End date must be on or after the start date.'})
+        return attrs
+    
+    def validate_filters(self, value):
+        """Normalize filters.selected_days to a list of weekday numbers (Monday=0)"""
+        if value is None:
+            return value
+        if not isinstance(value, dict):
+            raise serializers.ValidationError('Expected an object.')
+        
+        selected_days = value.get('selected_days')
+        if not selected_days:
+            return value
+        if isinstance(selected_days, str):
+            selected_days = selected_days.split(',')
+        if not isinstance(selected_days, list):
+            raise serializers.ValidationError({'selected_days': 'Expected a list of weekdays.'})
+        
+        normalized = []
+        for day in selected_days:
+            if isinstance(day, str) and day.strip().lower() in self.WEEKDAYS:
+                number = self.WEEKDAYS[day.strip().lower()]
+            elif isinstance(day, int) and not isinstance(day, bool) and 0 <= day <= 6:
+                number = day
+            else:
+                raise serializers.ValidationError({'selected_days': f'Invalid weekday: {day!r}.'})
+            if number not in normalized:
+                normalized.append(number)
+        
+        return {**value, 'selected_days': normalized}
\ No newline at end of file
@@ -0,0 +1,81 @@
+"""
+Background report export jobs.
+
+The project has no task queue, so exports are submitted to a single background
+worker thread once the request that created the ReportExport row has committed.
+One worker keeps rendering serialized: concurrent requests queue up instead of each
+competing for the GIL with the web worker. Clients poll ReportExportStatusView to see
+the PENDING -> COMPLETED/FAILED transition. The worker dies with its process, so the
+status view reports exports left PENDING past ReportExport.STALE_AFTER as FAILED.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import ReportExport
+
+
+# Shared by every export in this process; its one thread starts on the first submit
+EXPORT_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix='report-export')
+
+
+def generate_report_export(export_id):
+    """Render the export's PDF/CSV and write it to the default storage"""
+    # Imported here: views imports this module
+    from .views import SimpleReportExport
+
+    try:
+        export = ReportExport.objects.get(pk=export_id)
+    except ReportExport.DoesNotExist:
+        return
+    if export.status != 'PENDING':
+        # Already reported FAILED as stale while it waited in the queue
+        return
+
+    export.started_at = timezone.now()
+    export.save(update_fields=['started_at'])
+
+    try:
+        today = timezone.localdate()
+        start_date = export.start_date or today.replace(day=1)
+        end_date = export.end_date or today
+        start_datetime = timezone.make_aware(datetime.combine(start_date, time.min))
+        end_datetime = timezone.make_aware(datetime.combine(end_date, time.max))
+        selected_days = (export.filters or {}).get('selected_days') or []
+
+        exporter = SimpleReportExport()
+        if export.export_format == 'PDF':
+            response = exporter.generate_pdf(export.report_type, start_date, end_date, start_datetime, end_datetime, selected_days)
+            content = response.content
+            extension = 'pdf'
+        else:
+            response = exporter.generate_csv(export.report_type, start_date, end_date, start_datetime, end_datetime, selected_days)
+            content = b''.join(response.streaming_content)
+            extension = 'csv'
+
+        export.file_path = default_storage.save(f'exports/{export.report_type}_{export.id}.{extension}', ContentFile(content))
+        export.file_size = len(content)
+        export.status = 'COMPLETED'
+        export.completed_at = timezone.now()
+        export.save(update_fields=['file_path', 'file_size', 'status', 'completed_at'])
+    except Exception as e:
+        export.status = 'FAILED'
+        export.error_message = str(e)
+        export.save(update_fields=['status', 'error_message'])
+
+
+def run_report_export(export_id):
+    """Worker task: generate the export, then close the worker's own DB connection"""
+    try:
+        generate_report_export(export_id)
+    finally:
+        connection.close()
+
+
+def enqueue_report_export(export_id):
+    """Queue generate_report_export on the export worker after the current transaction commits"""
+    transaction.on_commit(lambda: EXPORT_EXECUTOR.submit(run_report_export, export_id))
@@ -9,6 +9,8 @@ from .views import (
     StaffPerformanceView,
     ReportExportView, 
     ReportExportListView, 
+    ReportExportStatusView,
+    ReportExportDownloadView,
     SimpleReportExport,  # ✅ NEW: Simple export view
     TestExportView
 )
@@ -36,5 +38,7 @@ urlpatterns = [
     
     # EXPORT MANAGEMENT
     path('exports/', ReportExportListView.as_view(), name='export-list'),
+    path('exports/<int:pk>/', ReportExportStatusView.as_view(), name='export-status'),
+    path('exports/<int:pk>/download/', ReportExportDownloadView.as_view(), name='export-download'),
     path('export/', ReportExportView.as_view(), name='report-export'),
 ]
\ No newline at end of file
@@ -3,30 +3,38 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.renderers import BaseRenderer
-from django.db.models import Sum, Count, F, Q, Avg
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.reverse import reverse
+from django.db import connection
+from django.db.models import Sum, Count, F, Q, Avg, Max, DateField, DateTimeField, Func, Value
 from django.utils import timezone
-from django.http import HttpResponse, Http404
+from django.core.cache import cache
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse, Http404
+from django.core.files.storage import default_storage
 from django.views import View
-from datetime import timedelta, datetime, time
-from io import BytesIO, StringIO
+from datetime import timedelta, datetime, date, time
 from django.shortcuts import get_object_or_404
 import csv
+import os
+from io import StringIO
+from itertools import islice
 
-from django.db.models.functions import ExtractDay, ExtractHour, TruncDate
+from django.db.models.functions import Coalesce, ExtractDay, ExtractHour, ExtractWeekDay, TruncDate, TruncHour, TruncMonth, TruncYear
 
 # ReportLab Imports
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.units import inch
 from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, LongTable, TableStyle
 from reportlab.lib import colors
 
 # App Imports
 from accounts.permissions import IsOwner
 from pos.models import SalesTransaction, TransactionItem
-from inventory.models import Product, Category, InventoryMovement, LowStockAlert
+from inventory.models import Product, InventoryMovement, LowStockAlert
 from .models import DashboardMetric, ReportSchedule, ReportExport
+from .tasks import enqueue_report_export
 from .serializers import (
     DashboardOverviewSerializer, DashboardMetricSerializer,
     SalesAnalyticsSerializer, InventoryAnalyticsSerializer,
@@ -70,13 +78,48 @@ class SimpleProductStockSerializer(serializers.ModelSerializer):
         fields = ('id', 'name', 'current_stock')
 
 
-PROFIT_AGGREGATION = Sum(F('items__quantity') * (F('items__unit_price') - F('items__product__cost_price')))
+# Status values are stored upper-case (normalized on save and by pos migration 0008)
+COMPLETED_STATUSES = ('COMPLETED', 'PAID')
+SALES_STATUSES = DashboardMetric.SALES_STATUSES  # completed + pending
+
+# Python weekday() (0=Monday..6=Sunday) -> ExtractWeekDay (1=Sunday..7=Saturday)
+WEEKDAY_TO_DB_WEEK_DAY = {0: 2, 1: 3, 2: 4, 3: 5, 4: 6, 5: 7, 6: 1}
+
+# Per-item expressions: aggregate these on TransactionItem, never through SalesTransaction.items,
+# since that join repeats each transaction row once per item and inflates header sums/counts
+ITEM_PROFIT = F('quantity') * (F('unit_price') - F('product__cost_price'))
+COST_AGGREGATION = Sum(F('quantity') * F('product__cost_price'))
+
+# Transactions fetched (and items looked up) per round trip in the sales export
+EXPORT_CHUNK_SIZE = 500
+
+
+DASHBOARD_CACHE_TIMEOUT = 60
+
+
+def _cache_stamp(value):
+    # Cache keys must not contain spaces (memcached), so render datetimes as ISO 8601
+    return value.isoformat() if value else value
 
 
 class DashboardOverviewView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
+        # The payload only changes when a sale is recorded or edited (e.g. voided), stock
+        # moves or a product is edited, so key the cache on the newest ids/updated_at
+        # (plus the date, since "today" rolls over at midnight)
+        txn = SalesTransaction.objects.aggregate(id=Max('id'), updated=Max('updated_at'))
+        latest_movement_id = InventoryMovement.objects.aggregate(m=Max('id'))['m']
+        products_updated = Product.objects.aggregate(m=Max('updated_at'))['m']
+        today = timezone.localdate()
+        key = (
+            f"dashboard-overview:{today}:{txn['id']}:{_cache_stamp(txn['updated'])}:"
+            f"{latest_movement_id}:{_cache_stamp(products_updated)}"
+        )
+        return Response(cache.get_or_set(key, self.compute, DASHBOARD_CACHE_TIMEOUT))
+
+    def compute(self):
         # 1. Get current time in Local Timezone (Asia/Manila)
         now = timezone.localtime(timezone.now())
         
@@ -85,29 +128,52 @@ class DashboardOverviewView(APIView):
         start_of_week = start_of_day - timedelta(days=now.weekday()) # Monday of this week
         start_of_month = start_of_day.replace(day=1) # 1st of this month
 
-        valid_statuses = ['COMPLETED', 'PAID', 'PENDING', 'Completed', 'Paid']
+        valid_statuses = SALES_STATUSES
         base_filter = SalesTransaction.objects.filter(status__in=valid_statuses)
         
-        # 3. Use __gte (Greater Than or Equal) on the timestamp
-        today_txns = base_filter.filter(created_at__gte=start_of_day)
-        week_txns = base_filter.filter(created_at__gte=start_of_week)
-        month_txns = base_filter.filter(created_at__gte=start_of_month)
-
-        def get_metrics(txns):
-            metrics = txns.aggregate(
-                sales=Sum('total_amount'), 
-                transactions=Count('id'), 
-                profit_sum=PROFIT_AGGREGATION
-            )
-            return {
-                'sales': metrics['sales'] or 0, 
-                'transactions': metrics['transactions'] or 0, 
-                'profit': metrics['profit_sum'] or 0
-            }
-
-        today_data = get_metrics(today_txns)
-        week_data = get_metrics(week_txns)
-        month_data = get_metrics(month_txns)
+        # 3. Closed days come from the precomputed DashboardMetric rows (see the
+        # rebuild_dashboard_metrics command) so only today is aggregated live. The week can
+        # start before the 1st of the month, so cover from whichever is earlier; if any day
+        # in that range has no stored row, fall back to aggregating the whole range live.
+        # Voiding/refunding a past sale regenerates its day's row (SalesTransaction.save).
+        window_start = min(start_of_week, start_of_month)
+        history = list(DashboardMetric.objects.filter(
+            date__gte=window_start.date(), date__lt=start_of_day.date()
+        ).values('date', 'daily_sales', 'daily_transactions', 'daily_profit'))
+        if len(history) == (start_of_day - window_start).days:
+            window_start = start_of_day
+        else:
+            history = []
+        
+        def history_total(field, since):
+            return sum(row[field] for row in history if row['date'] >= since.date())
+        
+        # Use __gte (Greater Than or Equal) on the timestamp
+        window_txns = base_filter.filter(created_at__gte=window_start)
+        is_today = Q(created_at__gte=start_of_day)
+        is_this_week = Q(created_at__gte=start_of_week)
+        is_this_month = Q(created_at__gte=start_of_month)
+        
+        # One pass over the headers for sales/transactions per window...
+        sales_metrics = window_txns.aggregate(
+            today_sales=Sum('total_amount', filter=is_today),
+            today_transactions=Count('id', filter=is_today),
+            week_sales=Sum('total_amount', filter=is_this_week),
+            week_transactions=Count('id', filter=is_this_week),
+            month_sales=Sum('total_amount', filter=is_this_month),
+            month_transactions=Count('id', filter=is_this_month),
+        )
+        
+        # ...and one over the items for profit, so the items join can't inflate the header sums
+        # (filtering through the FK join lets the planner use the (status, created_at) index)
+        item_metrics = TransactionItem.objects.filter(
+            transaction__status__in=valid_statuses, transaction__created_at__gte=window_start
+        ).aggregate(
+            today_items_sold=Sum('quantity', filter=Q(transaction__created_at__gte=start_of_day)),
+            today_profit=Sum(ITEM_PROFIT, filter=Q(transaction__created_at__gte=start_of_day)),
+            week_profit=Sum(ITEM_PROFIT, filter=Q(transaction__created_at__gte=start_of_week)),
+            month_profit=Sum(ITEM_PROFIT, filter=Q(transaction__created_at__gte=start_of_month)),
+        )
         
         total_products = Product.objects.filter(is_active=True).count()
         low_stock_count = Product.objects.filter(current_stock__lt=10, is_active=True).count()
@@ -118,7 +184,7 @@ class DashboardOverviewView(APIView):
         
         # Top products logic (based on month transactions)
         top_products = TransactionItem.objects.filter(
-            transaction__in=month_txns
+            transaction__status__in=valid_statuses, transaction__created_at__gte=start_of_month
         ).values(
             'product__id', 'product__name', 'product__sku'
         ).annotate(
@@ -131,18 +197,16 @@ class DashboardOverviewView(APIView):
         )
         
         data = {
-            'today_sales': float(today_data['sales']), 
-            'today_transactions': today_data['transactions'],
-            'today_profit': float(today_data['profit']),
-            'today_items_sold': TransactionItem.objects.filter(
-                transaction__in=today_txns
-            ).aggregate(total=Sum('quantity'))['total'] or 0,
-            'week_sales': float(week_data['sales']), 
-            'week_transactions': week_data['transactions'], 
-            'week_profit': float(week_data['profit']),
-            'month_sales': float(month_data['sales']), 
-            'month_transactions': month_data['transactions'], 
-            'month_profit': float(month_data['profit']),
+            'today_sales': float(sales_metrics['today_sales'] or 0), 
+            'today_transactions': sales_metrics['today_transactions'] or 0,
+            'today_profit': float(item_metrics['today_profit'] or 0),
+            'today_items_sold': item_metrics['today_items_sold'] or 0,
+            'week_sales': float((sales_metrics['week_sales'] or 0) + history_total('daily_sales', start_of_week)), 
+            'week_transactions': (sales_metrics['week_transactions'] or 0) + history_total('daily_transactions', start_of_week), 
+            'week_profit': float((item_metrics['week_profit'] or 0) + history_total('daily_profit', start_of_week)),
+            'month_sales': float((sales_metrics['month_sales'] or 0) + history_total('daily_sales', start_of_month)), 
+            'month_transactions': (sales_metrics['month_transactions'] or 0) + history_total('daily_transactions', start_of_month), 
+            'month_profit': float((item_metrics['month_profit'] or 0) + history_total('daily_profit', start_of_month)),
             'total_products': total_products, 
             'low_stock_count': low_stock_count, 
             'out_of_stock_count': out_of_stock_count,
@@ -152,7 +216,7 @@ class DashboardOverviewView(APIView):
             'recent_transactions': list(recent_txns)
         }
         
-        return Response(DashboardOverviewSerializer(data).data)
+        return dict(DashboardOverviewSerializer(data).data)
 
 
 class DashboardMetricsHistoryView(generics.ListAPIView):
@@ -165,17 +229,25 @@ class DashboardMetricsHistoryView(generics.ListAPIView):
         return DashboardMetric.objects.filter(date__gte=start_date)
 
 
+# Short labels for the weekly / yearly trend charts
+DAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+class RecentTransactionsPagination(PageNumberPagination):
+    """Pagination for the optional recent transactions list in sales analytics"""
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
 class SalesAnalyticsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         period = request.query_params.get('period', 'month')
-        now = timezone.localtime(timezone.now())
-        today = now.date()
-        
-        # Day names for weekly display
-        day_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-        month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+        tz = timezone.get_current_timezone()
+        today = timezone.now().astimezone(tz).date()
         
         # Determine date range based on period
         if period == 'day':
@@ -200,7 +272,7 @@ class SalesAnalyticsView(APIView):
         elif period == 'all':
             # Get earliest transaction date
             earliest = SalesTransaction.objects.filter(
-                status__in=['COMPLETED', 'PAID', 'Completed', 'Paid']
+                status__in=COMPLETED_STATUSES
             ).order_by('created_at').first()
             start_date = earliest.created_at.date() if earliest else today.replace(month=1, day=1)
             end_date = today
@@ -212,25 +284,37 @@ class SalesAnalyticsView(APIView):
         
         # Query transactions
         all_txns = SalesTransaction.objects.filter(
-            status__in=['COMPLETED', 'PAID', 'PENDING', 'Completed', 'Paid'],
+            status__in=SALES_STATUSES,
             created_at__date__gte=start_date,
             created_at__date__lte=end_date
-        ).order_by('created_at')
+        )
+        
+        totals = all_txns.aggregate(total=Sum('total_amount'), count=Count('id'))
+        total_sales = float(totals['total'] or 0)
+        total_transactions = totals['count'] or 0
         
-        total_sales = 0.0
-        total_transactions = 0
+        # Bucket in the database (local timezone) so only one row per bucket comes back
+        if grouping == 'hourly':
+            bucket = TruncHour('created_at', tzinfo=tz)
+        elif grouping == 'daily':
+            bucket = TruncDate('created_at', tzinfo=tz)
+        elif grouping == 'monthly':
+            bucket = TruncMonth('created_at', output_field=DateField(), tzinfo=tz)
+        else:
+            bucket = TruncYear('created_at', output_field=DateField(), tzinfo=tz)
+        
+        buckets = all_txns.annotate(bucket=bucket).values('bucket').annotate(
+            total=Sum('total_amount'), count=Count('id')
+        )
         
         # Group data based on period
         if grouping == 'hourly':
             # Daily view: group by hour
             hourly_data = {i: {'total': 0.0, 'count': 0} for i in range(24)}
-            for txn in all_txns:
-                hour = timezone.localtime(txn.created_at).hour
-                amount = float(txn.total_amount)
-                total_sales += amount
-                total_transactions += 1
-                hourly_data[hour]['total'] += amount
-                hourly_data[hour]['count'] += 1
+            for row in buckets:
+                hour = row['bucket'].astimezone(tz).hour
+                hourly_data[hour]['total'] += float(row['total'])
+                hourly_data[hour]['count'] += row['count']
             
             daily_trend = [
                 {'day': f'{h:02d}:00', 'label': f'{h:02d}:00', 'total': hourly_data[h]['total'], 'count': hourly_data[h]['count']}
@@ -240,19 +324,15 @@ class SalesAnalyticsView(APIView):
         elif grouping == 'daily' and period == 'week':
             # Weekly view: group by day of week (Mon-Sun)
             weekly_data = {i: {'total': 0.0, 'count': 0} for i in range(7)}
-            for txn in all_txns:
-                local_dt = timezone.localtime(txn.created_at)
-                day_of_week = local_dt.weekday()  # 0=Monday, 6=Sunday
-                amount = float(txn.total_amount)
-                total_sales += amount
-                total_transactions += 1
-                weekly_data[day_of_week]['total'] += amount
-                weekly_data[day_of_week]['count'] += 1
+            for row in buckets:
+                day_of_week = row['bucket'].weekday()  # 0=Monday, 6=Sunday
+                weekly_data[day_of_week]['total'] += float(row['total'])
+                weekly_data[day_of_week]['count'] += row['count']
             
             daily_trend = [
                 {
                     'day': (start_date + timedelta(days=i)).strftime('%Y-%m-%d'),
-                    'label': day_names[i],
+                    'label': DAY_NAMES[i],
                     'total': weekly_data[i]['total'],
                     'count': weekly_data[i]['count']
                 }
@@ -261,27 +341,18 @@ class SalesAnalyticsView(APIView):
         
         elif grouping == 'daily':
             # Monthly view: daily breakdown
-            sales_by_date = {}
-            for txn in all_txns:
-                local_date = timezone.localtime(txn.created_at).strftime('%Y-%m-%d')
-                amount = float(txn.total_amount)
-                total_sales += amount
-                total_transactions += 1
-                if local_date in sales_by_date:
-                    sales_by_date[local_date]['total'] += amount
-                    sales_by_date[local_date]['count'] += 1
-                else:
-                    sales_by_date[local_date] = {'total': amount, 'count': 1}
+            sales_by_date = {
+                row['bucket']: {'total': float(row['total']), 'count': row['count']}
+                for row in buckets
+            }
             
             daily_trend = []
             current = start_date
             while current <= min(end_date, today):
-                date_str = current.strftime('%Y-%m-%d')
-                day_num = current.day
-                data = sales_by_date.get(date_str, {'total': 0.0, 'count': 0})
+                data = sales_by_date.get(current, {'total': 0.0, 'count': 0})
                 daily_trend.append({
-                    'day': date_str,
-                    'label': str(day_num),
+                    'day': current.strftime('%Y-%m-%d'),
+                    'label': str(current.day),
                     'total': data['total'],
                     'count': data['count']
                 })
@@ -290,19 +361,15 @@ class SalesAnalyticsView(APIView):
         elif grouping == 'monthly':
             # Yearly view: monthly breakdown
             monthly_data = {i: {'total': 0.0, 'count': 0} for i in range(1, 13)}
-            for txn in all_txns:
-                local_dt = timezone.localtime(txn.created_at)
-                month = local_dt.month
-                amount = float(txn.total_amount)
-                total_sales += amount
-                total_transactions += 1
-                monthly_data[month]['total'] += amount
-                monthly_data[month]['count'] += 1
+            for row in buckets:
+                month = row['bucket'].month
+                monthly_data[month]['total'] += float(row['total'])
+                monthly_data[month]['count'] += row['count']
             
             daily_trend = [
                 {
                     'day': f'{start_date.year}-{m:02d}-01',
-                    'label': month_names[m-1],
+                    'label': MONTH_NAMES[m-1],
                     'total': monthly_data[m]['total'],
                     'count': monthly_data[m]['count']
                 }
@@ -311,18 +378,10 @@ class SalesAnalyticsView(APIView):
         
         elif grouping == 'yearly':
             # All Time view: yearly breakdown
-            yearly_data = {}
-            for txn in all_txns:
-                local_dt = timezone.localtime(txn.created_at)
-                year = local_dt.year
-                amount = float(txn.total_amount)
-                total_sales += amount
-                total_transactions += 1
-                if year in yearly_data:
-                    yearly_data[year]['total'] += amount
-                    yearly_data[year]['count'] += 1
-                else:
-                    yearly_data[year] = {'total': amount, 'count': 1}
+            yearly_data = {
+                row['bucket'].year: {'total': float(row['total']), 'count': row['count']}
+                for row in buckets
+            }
             
             # Get range of years
             if yearly_data:
@@ -342,11 +401,6 @@ class SalesAnalyticsView(APIView):
         else:
             daily_trend = []
         
-        # Get recent transactions
-        recent_transactions_list = SalesTransaction.objects.all().order_by('-created_at')[:50].values(
-            'id', 'transaction_number', 'created_at', 'total_amount', 'status', 'payment_method'
-        )
-        
         data = {
             'period': period,
             'grouping': grouping,
@@ -356,8 +410,17 @@ class SalesAnalyticsView(APIView):
             'total_transactions': total_transactions,
             'average_transaction': total_sales / total_transactions if total_transactions > 0 else 0,
             'daily_trend': daily_trend,
-            'transactions': list(recent_transactions_list)
         }
+        
+        # Recent transactions only when asked for (?include_recent=true), one page at a time.
+        # Served from the covering (-created_at) index, no heap visits needed
+        if request.query_params.get('include_recent', '').lower() == 'true':
+            recent_transactions = SalesTransaction.objects.values(
+                'id', 'transaction_number', 'created_at', 'total_amount', 'status', 'payment_method'
+            ).order_by('-created_at')
+            paginator = RecentTransactionsPagination()
+            page = paginator.paginate_queryset(recent_transactions, request, view=self)
+            data['transactions'] = paginator.get_paginated_response(page).data
         return Response(data)
 
 
@@ -366,22 +429,39 @@ class InventoryAnalyticsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        total_products = Product.objects.count()
-        active_products = Product.objects.filter(is_active=True).count()
-        total_inventory_value = Product.objects.filter(is_active=True).aggregate(total=Sum(F('current_stock') * F('cost_price')))['total'] or 0
-        low_stock_count = Product.objects.filter(current_stock__lt=10, is_active=True).count()
-        out_of_stock_count = Product.objects.filter(current_stock=0, is_active=True).count()
-        expired_products = Product.objects.filter(expiry_date__lt=timezone.now().date(), is_active=True).count()
-        average_stock_age = Product.objects.filter(is_active=True).annotate(age=ExtractDay(timezone.now() - F('created_at'))).aggregate(avg=Avg('age'))['avg'] or 0
+        latest_movement_id = InventoryMovement.objects.aggregate(m=Max('id'))['m']
+        products_updated = Product.objects.aggregate(m=Max('updated_at'))['m']
+        key = f'inventory-analytics:{timezone.localdate()}:{latest_movement_id}:{_cache_stamp(products_updated)}'
+        return Response(cache.get_or_set(key, self.compute, DASHBOARD_CACHE_TIMEOUT))
+
+    def compute(self):
+        now = timezone.now()
+        is_active = Q(is_active=True)
+        product_metrics = Product.objects.aggregate(
+            total_products=Count('id'),
+            active_products=Count('id', filter=is_active),
+            total_inventory_value=Sum(F('current_stock') * F('cost_price'), filter=is_active),
+            low_stock_count=Count('id', filter=is_active & Q(current_stock__lt=10)),
+            out_of_stock_count=Count('id', filter=is_active & Q(current_stock=0)),
+            expired_products=Count('id', filter=is_active & Q(expiry_date__lt=now.date())),
+            average_stock_age=Avg(ExtractDay(now - F('created_at')), filter=is_active),
+        )
+        total_products = product_metrics['total_products']
+        active_products = product_metrics['active_products']
+        total_inventory_value = product_metrics['total_inventory_value'] or 0
+        low_stock_count = product_metrics['low_stock_count']
+        out_of_stock_count = product_metrics['out_of_stock_count']
+        expired_products = product_metrics['expired_products']
+        average_stock_age = product_metrics['average_stock_age'] or 0
         last_30_days = timezone.now() - timedelta(days=30)
-        fast_moving = TransactionItem.objects.filter(transaction__status__in=['COMPLETED', 'PAID', 'Completed'], transaction__created_at__gte=last_30_days).values('product__id', 'product__name', 'product__current_stock').annotate(total_sold=Sum('quantity')).order_by('-total_sold')[:10]
-        slow_moving = Product.objects.filter(is_active=True).annotate(sold=Sum('transaction_items__quantity', filter=Q(transaction_items__transaction__status__in=['COMPLETED', 'PAID', 'Completed'], transaction_items__transaction__created_at__gte=last_30_days))).filter(Q(sold__isnull=True) | Q(sold__lte=5)).values('id', 'name', 'current_stock', 'sold')[:10]
+        fast_moving = TransactionItem.objects.filter(transaction__status__in=COMPLETED_STATUSES, transaction__created_at__gte=last_30_days).values('product__id', 'product__name', 'product__current_stock').annotate(total_sold=Sum('quantity')).order_by('-total_sold')[:10]
+        slow_moving = Product.objects.filter(is_active=True).annotate(sold=Sum('transaction_items__quantity', filter=Q(transaction_items__transaction__status__in=COMPLETED_STATUSES, transaction_items__transaction__created_at__gte=last_30_days))).filter(Q(sold__isnull=True) | Q(sold__lte=5)).values('id', 'name', 'current_stock', 'sold')[:10]
         category_distribution = Product.objects.filter(is_active=True).values('category__name').annotate(product_count=Count('id'), total_stock=Sum('current_stock'), total_value=Sum(F('current_stock') * F('cost_price'))).order_by('-total_value')
         stock_in_total = InventoryMovement.objects.filter(movement_type='STOCK_IN', created_at__gte=last_30_days).aggregate(total=Sum('quantity'))['total'] or 0
         stock_out_total = InventoryMovement.objects.filter(movement_type__in=['STOCK_OUT', 'SALE'], created_at__gte=last_30_days).aggregate(total=Sum('quantity'))['total'] or 0
         adjustments_total = InventoryMovement.objects.filter(movement_type='ADJUSTMENT', created_at__gte=last_30_days).count()
         data = {'total_products': total_products, 'active_products': active_products, 'total_inventory_value': float(total_inventory_value), 'low_stock_count': low_stock_count, 'out_of_stock_count': out_of_stock_count, 'expired_products': expired_products, 'average_stock_age': int(average_stock_age) if average_stock_age else 0, 'fast_moving_products': list(fast_moving), 'slow_moving_products': list(slow_moving), 'category_distribution': list(category_distribution), 'stock_in_total': stock_in_total, 'stock_out_total': stock_out_total, 'adjustments_total': adjustments_total}
-        return Response(InventoryAnalyticsSerializer(data).data)
+        return dict(InventoryAnalyticsSerializer(data).data)
 
 
 class SimpleInventoryListView(generics.ListAPIView):
@@ -412,33 +492,30 @@ class ProfitLossReportView(APIView):
                 start_date = today.replace(day=1)
                 end_date = today
         filter_end_date = end_date + timedelta(days=1)
-        transactions = SalesTransaction.objects.filter(status__in=['COMPLETED', 'PAID', 'Completed'], created_at__date__gte=start_date, created_at__date__lt=filter_end_date)
-        gross_sales = transactions.aggregate(total=Sum('subtotal'))['total'] or 0
-        discounts = transactions.aggregate(total=Sum('discount'))['total'] or 0
-        net_sales = transactions.aggregate(total=Sum('total_amount'))['total'] or 0
-        cost_of_goods_sold = sum(item.product.cost_price * item.quantity for t in transactions for item in t.items.all())
+        transactions = SalesTransaction.objects.filter(status__in=COMPLETED_STATUSES, created_at__date__gte=start_date, created_at__date__lt=filter_end_date)
+        totals = transactions.aggregate(gross_sales=Sum('subtotal'), discounts=Sum('discount'), net_sales=Sum('total_amount'))
+        gross_sales = totals['gross_sales'] or 0
+        discounts = totals['discounts'] or 0
+        net_sales = totals['net_sales'] or 0
+        sold_items = TransactionItem.objects.filter(transaction__in=transactions)
+        cost_of_goods_sold = sold_items.aggregate(total=COST_AGGREGATION)['total'] or 0
         gross_profit = net_sales - cost_of_goods_sold
         gross_profit_margin = (gross_profit / net_sales * 100) if net_sales > 0 else 0
         operating_expenses = 0
         net_profit = gross_profit - operating_expenses
         net_profit_margin = (net_profit / net_sales * 100) if net_sales > 0 else 0
+        # Rank in SQL so the database does the (top-N) sort instead of Python
         profit_by_category = []
-        for category in Category.objects.filter(is_active=True):
-            cat_items = TransactionItem.objects.filter(transaction__in=transactions, product__category=category)
-            cat_revenue = cat_items.aggregate(total=Sum('line_total'))['total'] or 0
-            cat_cost = sum(item.product.cost_price * item.quantity for item in cat_items)
+        category_items = sold_items.filter(product__category__is_active=True).values('product__category__name').annotate(revenue=Sum('line_total'), cost=COST_AGGREGATION).filter(revenue__gt=0).annotate(profit=F('revenue') - F('cost')).order_by('-profit')
+        for item in category_items:
+            cat_revenue = item['revenue']
+            cat_cost = item['cost'] or 0
             cat_profit = cat_revenue - cat_cost
-            if cat_revenue > 0:
-                profit_by_category.append({'category': category.name, 'revenue': float(cat_revenue), 'cost': float(cat_cost), 'profit': float(cat_profit), 'margin': float((cat_profit / cat_revenue * 100))})
-        profit_by_category.sort(key=lambda x: x['profit'], reverse=True)
+            profit_by_category.append({'category': item['product__category__name'], 'revenue': float(cat_revenue), 'cost': float(cat_cost), 'profit': float(cat_profit), 'margin': float((cat_profit / cat_revenue * 100))})
         profit_by_product = []
-        product_items = TransactionItem.objects.filter(transaction__in=transactions).values('product__id', 'product__name', 'product__cost_price').annotate(revenue=Sum('line_total'), quantity=Sum('quantity'))
+        product_items = sold_items.values('product__id', 'product__name').annotate(revenue=Sum('line_total'), total_quantity=Sum('quantity'), cost=COST_AGGREGATION).annotate(profit=F('revenue') - F('cost')).order_by('-profit')[:15]
         for item in product_items:
-            cost = item['product__cost_price'] * item['quantity']
-            profit = item['revenue'] - cost
-            profit_by_product.append({'product': item['product__name'], 'revenue': float(item['revenue']), 'cost': float(cost), 'profit': float(profit), 'quantity': item['quantity']})
-        profit_by_product.sort(key=lambda x: x['profit'], reverse=True)
-        profit_by_product = profit_by_product[:15]
+            profit_by_product.append({'product': item['product__name'], 'revenue': float(item['revenue']), 'cost': float(item['cost']), 'profit': float(item['profit']), 'quantity': item['total_quantity']})
         data = {'period': period, 'start_date': start_date, 'end_date': end_date, 'gross_sales': float(gross_sales), 'discounts': float(discounts), 'net_sales': float(net_sales), 'cost_of_goods_sold': float(cost_of_goods_sold), 'gross_profit': float(gross_profit), 'gross_profit_margin': float(gross_profit_margin), 'operating_expenses': float(operating_expenses), 'net_profit': float(net_profit), 'net_profit_margin': float(net_profit_margin), 'profit_by_category': profit_by_category, 'profit_by_product': profit_by_product}
         return Response(ProfitLossSerializer(data).data)
 
@@ -461,17 +538,25 @@ class StaffPerformanceView(APIView):
                 start_date = today.replace(day=1)
                 end_date = today
         filter_end_date = end_date + timedelta(days=1)
-        staff_users = User.objects.filter(role='STAFF', is_active=True)
+        staff_users = User.objects.filter(role='STAFF', is_active=True).only('id', 'full_name')
+        transactions = SalesTransaction.objects.filter(status__in=COMPLETED_STATUSES, created_by__in=staff_users, created_at__date__gte=start_date, created_at__date__lt=filter_end_date)
+        sales_by_user = {row['created_by_id']: row for row in transactions.values('created_by_id').annotate(total_sales=Sum('total_amount'), total_transactions=Count('id'))}
+        items_by_user = {row['transaction__created_by_id']: row['total_items'] for row in TransactionItem.objects.filter(transaction__in=transactions).values('transaction__created_by_id').annotate(total_items=Sum('quantity'))}
+        best_day_by_user = {}
+        for row in transactions.annotate(day=TruncDate('created_at')).values('created_by_id', 'day').annotate(total=Sum('total_amount')):
+            best = best_day_by_user.get(row['created_by_id'])
+            if best is None or row['total'] > best['total']:
+                best_day_by_user[row['created_by_id']] = row
+        days_worked = (end_date - start_date).days + 1
         performance_data = []
         for user in staff_users:
-            transactions = SalesTransaction.objects.filter(status__in=['COMPLETED', 'PAID', 'Completed'], created_by=user, created_at__date__gte=start_date, created_at__date__lt=filter_end_date)
-            total_sales = transactions.aggregate(total=Sum('total_amount'))['total'] or 0
-            total_transactions = transactions.count()
-            total_items = TransactionItem.objects.filter(transaction__in=transactions).aggregate(total=Sum('quantity'))['total'] or 0
+            sales = sales_by_user.get(user.id, {})
+            total_sales = sales.get('total_sales') or 0
+            total_transactions = sales.get('total_transactions', 0)
+            total_items = items_by_user.get(user.id) or 0
             average_transaction = total_sales / total_transactions if total_transactions > 0 else 0
-            days_worked = (end_date - start_date).days + 1
             transactions_per_day = total_transactions / days_worked if days_worked > 0 else 0
-            best_day = transactions.annotate(day=TruncDate('created_at')).values('day').annotate(total=Sum('total_amount')).order_by('-total').first()
+            best_day = best_day_by_user.get(user.id)
             best_selling_day = best_day['day'] if best_day else start_date
             best_selling_day_amount = best_day['total'] if best_day else 0
             performance_data.append({'staff_id': user.id, 'staff_name': user.full_name, 'total_sales': float(total_sales), 'total_transactions': total_transactions, 'total_items_sold': total_items, 'average_transaction': float(average_transaction), 'transactions_per_day': float(transactions_per_day), 'best_selling_day': best_selling_day, 'best_selling_day_amount': float(best_selling_day_amount)})
@@ -486,11 +571,10 @@ class ReportExportView(APIView):
         serializer = ExportRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         export = ReportExport.objects.create(report_type=serializer.validated_data['report_type'], export_format=serializer.validated_data['export_format'], start_date=serializer.validated_data.get('start_date'), end_date=serializer.validated_data.get('end_date'), filters=serializer.validated_data.get('filters'), created_by=request.user, status='PENDING')
-        export.status = 'COMPLETED'
-        export.completed_at = timezone.now()
-        export.file_path = f'/exports/{export.report_type}_{export.id}.{export.export_format.lower()}'
-        export.save()
-        return Response({'message': 'Export created successfully', 'export': ReportExportSerializer(export).data}, status=status.HTTP_201_CREATED)
+        # Rendering happens off the request; poll status_url for the result
+        enqueue_report_export(export.id)
+        status_url = reverse('reports:export-status', kwargs={'pk': export.id}, request=request)
+        return Response({'message': 'Export queued', 'export': ReportExportSerializer(export, context={'request': request}).data, 'status_url': status_url}, status=status.HTTP_202_ACCEPTED)
 
 
 class ReportExportListView(generics.ListAPIView):
@@ -501,6 +585,105 @@ class ReportExportListView(generics.ListAPIView):
         return ReportExport.objects.filter(created_by=self.request.user).order_by('-created_at')
 
 
+class ReportExportStatusView(generics.RetrieveAPIView):
+    """Poll a queued export; file_url is set once it is COMPLETED"""
+    serializer_class = ReportExportSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ReportExport.objects.filter(created_by=self.request.user).select_related('created_by')
+
+    def get_object(self):
+        return super().get_object().fail_if_stale()
+
+
+class ReportExportDownloadView(generics.GenericAPIView):
+    """Serve a COMPLETED export's file to the user who requested it"""
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ReportExport.objects.filter(created_by=self.request.user, status='COMPLETED').exclude(file_path='')
+
+    def get(self, request, pk):
+        export = self.get_object()
+        try:
+            file = default_storage.open(export.file_path, 'rb')
+        except FileNotFoundError:
+            raise Http404('Export file not found')
+        return FileResponse(file, as_attachment=True, filename=os.path.basename(export.file_path))
+
+
+def _month_to_date_range(today, month, year):
+    return today.replace(day=1), today
+
+
+def _week_range(today, month, year):
+    start_date = today - timedelta(days=today.weekday())
+    return start_date, start_date + timedelta(days=6)
+
+
+def _month_range(today, month, year):
+    # Selected month/year if valid, otherwise the current month
+    try:
+        start_date = date(int(year), int(month), 1)
+    except (ValueError, TypeError):
+        start_date = today.replace(day=1)
+    next_month = start_date.replace(day=28) + timedelta(days=4)
+    return start_date, next_month - timedelta(days=next_month.day)
+
+
+def _year_range(today, month, year):
+    # Selected year if valid, otherwise the current year
+    try:
+        return date(int(year), 1, 1), date(int(year), 12, 31)
+    except (ValueError, TypeError):
+        return date(today.year, 1, 1), date(today.year, 12, 31)
+
+
+def _all_time_range(today, month, year):
+    earliest = SalesTransaction.objects.filter(
+        status__in=COMPLETED_STATUSES
+    ).order_by('created_at').first()
+    start_date = earliest.created_at.date() if earliest else today.replace(month=1, day=1)
+    return start_date, today
+
+
+# period -> callable(today, selected_month, selected_year) -> (start_date, end_date)
+PERIOD_RESOLVERS = {
+    'day': lambda today, month, year: (today, today),
+    'week': _week_range,
+    'month': _month_range,
+    'year': _year_range,
+    'all': _all_time_range,
+}
+
+
+# Rows per csv writerows() call / streamed chunk in the CSV export
+CSV_BATCH_ROWS = 500
+
+# PDF styling is constant, so parse the sample stylesheet and build the table style once
+# (only the templates are shared; Paragraph/Table instances are created per export)
+PDF_STYLES = getSampleStyleSheet()
+PDF_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8FBC8F')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('TOPPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F5FFF5')),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+# Fixed column widths per report type; others let LongTable size the columns
+PDF_COL_WIDTHS = {
+    'sales': [1.2*inch, 1.0*inch, 1.2*inch, 2.0*inch, 1.0*inch, 1.0*inch],
+    'inventory': [2.5*inch, 1.5*inch, 0.8*inch, 1.0*inch, 1.0*inch],
+}
+
+
 class SimpleReportExport(View):
     """Simple function-based export with product details"""
     
@@ -544,70 +727,8 @@ class SimpleReportExport(View):
                 end_date = today
         else:
             # Use Periods
-            if period == 'day':
-                # Daily - use specific date or today
-                if specific_date_str:
-                    try:
-                        start_date = datetime.strptime(specific_date_str, '%Y-%m-%d').date()
-                        end_date = start_date
-                    except ValueError:
-                        start_date = today
-                        end_date = today
-                else:
-                    start_date = today
-                    end_date = today
-            elif period == 'week':
-                start_date = today - timedelta(days=today.weekday())
-                end_date = start_date + timedelta(days=6)
-            elif period == 'month':
-                # Monthly - use selected month and year
-                if selected_month and selected_year:
-                    try:
-                        year = int(selected_year)
-                        month = int(selected_month)
-                        start_date = datetime(year, month, 1).date()
-                        # Last day of month
-                        if month == 12:
-                            end_date = datetime(year, 12, 31).date()
-                        else:
-                            end_date = (datetime(year, month + 1, 1) - timedelta(days=1)).date()
-                        print(f"👉 Selected Month: {month}/{year}")
-                    except (ValueError, TypeError):
-                        start_date = today.replace(day=1)
-                        next_month = today.replace(day=28) + timedelta(days=4)
-                        end_date = next_month - timedelta(days=next_month.day)
-                else:
-                    start_date = today.replace(day=1)
-                    next_month = today.replace(day=28) + timedelta(days=4)
-                    end_date = next_month - timedelta(days=next_month.day)
-            elif period == 'year':
-                # Yearly - use selected year
-                if selected_year:
-                    try:
-                        year = int(selected_year)
-                        start_date = datetime(year, 1, 1).date()
-                        end_date = datetime(year, 12, 31).date()
-                        print(f"👉 Selected Year: {year}")
-                    except (ValueError, TypeError):
-                        start_date = today.replace(month=1, day=1)
-                        end_date = today.replace(month=12, day=31)
-                else:
-                    start_date = today.replace(month=1, day=1)
-                    end_date = today.replace(month=12, day=31)
-            elif period == 'all':
-                # All time: get earliest transaction date
-                earliest = SalesTransaction.objects.filter(
-                    status__in=['COMPLETED', 'PAID', 'Completed', 'Paid']
-                ).order_by('created_at').first()
-                if earliest:
-                    start_date = earliest.created_at.date()
-                else:
-                    start_date = today.replace(month=1, day=1)
-                end_date = today
-                print(f"👉 ALL TIME: {start_date} to {end_date}")
-            else:
-                start_date = today.replace(day=1)
-                end_date = today
+            resolve = PERIOD_RESOLVERS.get(period, _month_to_date_range)
+            start_date, end_date = resolve(today, selected_month, selected_year)
 
         print(f"📅 Date Range: {start_date} to {end_date}")
 
@@ -629,12 +750,14 @@ class SimpleReportExport(View):
     def generate_pdf(self, report_type, start_date, end_date, start_datetime, end_datetime, selected_days=None):
         print(f"Generating PDF for {report_type}...")
         
-        buffer = BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter, 
+        # ReportLab writes straight into the (file-like) response, no intermediate buffer
+        response = HttpResponse(content_type='application/pdf')
+        response['Content-Disposition'] = f'attachment; filename="{report_type}_{start_date}.pdf"'
+        doc = SimpleDocTemplate(response, pagesize=letter, 
                                rightMargin=30, leftMargin=30,
                                topMargin=30, bottomMargin=30)
         elements = []
-        styles = getSampleStyleSheet()
+        styles = PDF_STYLES
         
         title = Paragraph(f"<b>{report_type.upper()} REPORT</b>", styles['Title'])
         elements.append(title)
@@ -655,164 +778,195 @@ class SimpleReportExport(View):
         elements.append(Spacer(1, 0.3*inch))
         
         # Pass the DATETIMES and selected_days to the data fetcher
-        data = self.get_report_data(report_type, start_datetime, end_datetime, selected_days)
+        data = list(self.get_report_data(report_type, start_datetime, end_datetime, selected_days))
         
-        if data and len(data) > 1:
-            if report_type.lower() == 'sales':
-                col_widths = [1.2*inch, 1.0*inch, 1.2*inch, 2.0*inch, 1.0*inch, 1.0*inch]
-            elif report_type.lower() == 'inventory':
-                col_widths = [2.5*inch, 1.5*inch, 0.8*inch, 1.0*inch, 1.0*inch]
-            else:
-                col_widths = None
+        if len(data) > 1:
+            col_widths = PDF_COL_WIDTHS.get(report_type.lower())
             
-            table = Table(data, colWidths=col_widths)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#8FBC8F')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('TOPPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.HexColor('#F5FFF5')),
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ]))
+            # LongTable sizes columns greedily, which is much cheaper on multi-page reports
+            table = LongTable(data, colWidths=col_widths, repeatRows=1)
+            table.setStyle(PDF_TABLE_STYLE)
             elements.append(table)
         else:
             elements.append(Paragraph("<i>No data available for this period.</i>", styles['Italic']))
             
         doc.build(elements)
-        pdf_content = buffer.getvalue()
-        buffer.close()
-        
-        response = HttpResponse(pdf_content, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="{report_type}_{start_date}.pdf"'
         return response
 
     def generate_csv(self, report_type, start_date, end_date, start_datetime, end_datetime, selected_days=None):
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow([f"{report_type.upper()} REPORT"])
-        writer.writerow([f"Period: {start_date} to {end_date}"])
-        writer.writerow([])
+        buffer = StringIO()
+        writer = csv.writer(buffer)
         
-        # Pass the DATETIMES and selected_days to the data fetcher
-        data = self.get_report_data(report_type, start_datetime, end_datetime, selected_days)
+        def flush():
+            chunk = buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            return chunk
         
-        for row in data:
-            writer.writerow(row)
-        csv_content = output.getvalue()
-        output.close()
-        response = HttpResponse(csv_content, content_type='text/csv')
+        def rows():
+            writer.writerows([[f"{report_type.upper()} REPORT"], [f"Period: {start_date} to {end_date}"], []])
+            
+            # Pass the DATETIMES and selected_days to the data fetcher; rows are written
+            # with the C-level writerows() a batch at a time and streamed per batch
+            data = iter(self.get_report_data(report_type, start_datetime, end_datetime, selected_days))
+            while True:
+                batch = list(islice(data, CSV_BATCH_ROWS))
+                if not batch:
+                    break
+                writer.writerows(batch)
+                yield flush()
+            
+            chunk = flush()
+            if chunk:
+                yield chunk
+        
+        # Stream rows as they are written instead of building the whole file in memory
+        response = StreamingHttpResponse(rows(), content_type='text/csv')
         response['Content-Disposition'] = f'attachment; filename="{report_type}_{start_date}.csv"'
         return response
 
+    # report_type (lower-case) -> method building that report's rows
+    REPORT_BUILDERS = {
+        'sales': 'sales_report',
+        'inventory': 'inventory_report',
+        'staff': 'staff_report',
+    }
+
     def get_report_data(self, report_type, start_datetime, end_datetime, selected_days=None):
         """
         Uses Full Datetime (00:00:00 to 23:59:59) for accurate filtering
         Also filters by selected_days (list of weekday numbers: 0=Monday, 6=Sunday)
         """
-        report_type_lower = report_type.lower()
-        
-        if report_type_lower == 'sales':
-            # FIX: Use 'created_at__range' with timezone-aware datetimes
-            transactions = SalesTransaction.objects.filter(
-                created_at__range=(start_datetime, end_datetime),
-                status__in=['COMPLETED', 'PAID', 'Completed', 'Paid']
-            ).select_related('created_by').prefetch_related('items__product').order_by('-created_at')
-            
-            # Filter by selected days if provided
-            if selected_days:
-                filtered_transactions = []
-                for trans in transactions:
-                    local_dt = timezone.localtime(trans.created_at)
-                    if local_dt.weekday() in selected_days:
-                        filtered_transactions.append(trans)
-                transactions = filtered_transactions
-                print(f"📆 Filtered to {len(transactions)} transactions for selected days: {selected_days}")
-            
-            data = [['Date', 'Transaction #', 'Cashier', 'Products', 'Qty', 'Amount']]
+        builder = self.REPORT_BUILDERS.get(report_type.lower())
+        if builder is None:
+            return []
+        return getattr(self, builder)(start_datetime, end_datetime, selected_days)
+
+    def sales_report(self, start_datetime, end_datetime, selected_days=None):
+        # FIX: Use 'created_at__range' with timezone-aware datetimes
+        transactions = SalesTransaction.objects.filter(
+            created_at__range=(start_datetime, end_datetime),
+            status__in=COMPLETED_STATUSES
+        )
+        
+        # Filter by selected days if provided (in SQL, on the local-time weekday)
+        if selected_days:
+            transactions = transactions.annotate(
+                dow=ExtractWeekDay('created_at', tzinfo=timezone.get_current_timezone())
+            ).filter(dow__in=[WEEKDAY_TO_DB_WEEK_DAY[d] for d in selected_days])
+        
+        # TOTAL row from the same (day-filtered) set, before the per-row annotations
+        total_sales_sum = transactions.aggregate(total=Sum('total_amount'))['total'] or 0
+        
+        transactions = transactions.annotate(
+            # Cashier name from the join itself instead of a full User instance per row
+            cashier_name=Coalesce(F('created_by__full_name'), Value('Unknown')),
+            total_qty=Coalesce(Sum('items__quantity'), 0)
+        ).order_by('-created_at')
+        
+        # Convert to local wall-clock time in SQL where the database can (PostgreSQL
+        # timezone(zone, timestamptz) returns a naive local timestamp ready for strftime)
+        fields = ['id', 'created_at', 'transaction_number', 'total_amount', 'cashier_name', 'total_qty']
+        if connection.vendor == 'postgresql':
+            transactions = transactions.annotate(local_dt=Func(
+                Value(timezone.get_current_timezone_name()), F('created_at'),
+                function='timezone', output_field=DateTimeField()
+            ))
+            fields.append('local_dt')
+        
+        # Rows are produced lazily so the CSV export can stream them as they are read;
+        # plain dicts, since only a handful of columns are rendered
+        return self.sales_rows(transactions.values(*fields), total_sales_sum)
+
+    def inventory_report(self, start_datetime, end_datetime, selected_days=None):
+        # Only the rendered columns (plus the category FK for the join)
+        products = Product.objects.filter(is_active=True).select_related('category').only(
+            'name', 'current_stock', 'unit_price', 'category', 'category__name'
+        ).order_by('name')[:100]
+        data = [['Product Name', 'Category', 'Stock', 'Price', 'Status']]
+        for product in products:
+            status = 'Low Stock' if product.current_stock < 10 else 'In Stock'
+            data.append([
+                product.name,
+                product.category.name if product.category else 'N/A',
+                str(product.current_stock),
+                f"₱{product.unit_price:,.2f}",
+                status
+            ])
+        return data
+
+    def staff_report(self, start_datetime, end_datetime, selected_days=None):
+        # FIX: Staff performance needs strict ranges too
+        staff = User.objects.filter(role='STAFF', is_active=True).only('id', 'full_name')
+        data = [['Staff Name', 'Transactions', 'Items Sold', 'Total Sales']]
+        
+        # One grouped query per table instead of two aggregates per staff member.
+        # Items are summed on TransactionItem, since joining them into the
+        # transaction totals would repeat each total once per item
+        transactions = SalesTransaction.objects.filter(
+            created_by__in=staff,
+            created_at__range=(start_datetime, end_datetime),
+            status__in=COMPLETED_STATUSES
+        )
+        sales_by_user = {row['created_by_id']: row for row in transactions.values('created_by_id').annotate(total=Sum('total_amount'), txn_count=Count('id'))}
+        items_by_user = {row['transaction__created_by_id']: row['items_sold'] for row in TransactionItem.objects.filter(transaction__in=transactions).values('transaction__created_by_id').annotate(items_sold=Sum('quantity'))}
+        
+        for user in staff:
+            sales = sales_by_user.get(user.id, {})
+            total = sales.get('total') or 0
+            data.append([
+                user.full_name,
+                str(sales.get('txn_count', 0)),
+                str(items_by_user.get(user.id) or 0),
+                f"₱{total:,.2f}"
+            ])
+        return data
+
+    def sales_rows(self, transactions, total_sales_sum):
+        """Yield the sales report rows (header, one per transaction, TOTAL) from a values() queryset and its precomputed total"""
+        yield ['Date', 'Transaction #', 'Cashier', 'Products', 'Qty', 'Amount']
+        
+        # Fetch in chunks (server-side cursor on PostgreSQL), with one items query per chunk
+        rows = transactions.iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        while True:
+            chunk = list(islice(rows, EXPORT_CHUNK_SIZE))
+            if not chunk:
+                break
             
-            total_sales_sum = 0
+            items_by_txn = {}
+            for txn_id, product_name, quantity in TransactionItem.objects.filter(
+                transaction_id__in=[trans['id'] for trans in chunk]
+            ).order_by('id').values_list('transaction_id', 'product__name', 'quantity'):
+                items_by_txn.setdefault(txn_id, []).append((product_name, quantity))
             
-            for trans in transactions:
-                # Convert UTC DB time to Local Time for display
-                local_dt = timezone.localtime(trans.created_at)
+            for trans in chunk:
+                # Local time for display: annotated by the database, converted here otherwise
+                local_dt = trans.get('local_dt') or timezone.localtime(trans['created_at'])
                 
-                items = trans.items.all()
-                total_sales_sum += trans.total_amount
+                items = items_by_txn.get(trans['id'])
                 
                 if items:
-                    product_lines = []
-                    total_qty = 0
-                    for item in items:
-                        product_lines.append(f"{item.product.name} (x{item.quantity})")
-                        total_qty += item.quantity
-                    products_text = "\n".join(product_lines)
-                    data.append([
+                    products_text = "\n".join(f"{product_name} (x{quantity})" for product_name, quantity in items)
+                    yield [
                         local_dt.strftime('%Y-%m-%d\n%H:%M'),
-                        trans.transaction_number,
-                        trans.created_by.full_name if trans.created_by else 'Unknown',
+                        trans['transaction_number'],
+                        trans['cashier_name'],
                         products_text,
-                        str(total_qty),
-                        f"₱{trans.total_amount:,.2f}"
-                    ])
+                        str(trans['total_qty']),
+                        f"₱{trans['total_amount']:,.2f}"
+                    ]
                 else:
-                    data.append([
+                    yield [
                         local_dt.strftime('%Y-%m-%d\n%H:%M'),
-                        trans.transaction_number,
-                        trans.created_by.full_name if trans.created_by else 'Unknown',
+                        trans['transaction_number'],
+                        trans['cashier_name'],
                         'No items',
                         '0',
-                        f"₱{trans.total_amount:,.2f}"
-                    ])
-            
-            # Add a Total Row at the bottom
-            data.append(['', '', '', 'TOTAL SALES:', '', f"₱{total_sales_sum:,.2f}"])
-            
-            return data
-        
-        elif report_type_lower == 'inventory':
-            products = Product.objects.filter(is_active=True).select_related('category').order_by('name')[:100]
-            data = [['Product Name', 'Category', 'Stock', 'Price', 'Status']]
-            for product in products:
-                status = 'Low Stock' if product.current_stock < 10 else 'In Stock'
-                data.append([
-                    product.name,
-                    product.category.name if product.category else 'N/A',
-                    str(product.current_stock),
-                    f"₱{product.unit_price:,.2f}",
-                    status
-                ])
-            return data
-            
-        elif report_type_lower == 'staff':
-            # FIX: Staff performance needs strict ranges too
-            staff = User.objects.filter(role='STAFF', is_active=True)
-            data = [['Staff Name', 'Transactions', 'Items Sold', 'Total Sales']]
-            
-            for user in staff:
-                trans = SalesTransaction.objects.filter(
-                    created_by=user,
-                    created_at__range=(start_datetime, end_datetime),
-                    status__in=['COMPLETED', 'PAID', 'Completed', 'Paid']
-                )
-                total = trans.aggregate(Sum('total_amount'))['total_amount__sum'] or 0
-                items_sold = TransactionItem.objects.filter(
-                    transaction__in=trans
-                ).aggregate(Sum('quantity'))['quantity__sum'] or 0
-                
-                data.append([
-                    user.full_name,
-                    str(trans.count()),
-                    str(items_sold),
-                    f"₱{total:,.2f}"
-                ])
-            return data
-
-        return []
+                        f"₱{trans['total_amount']:,.2f}"
+                    ]
+        
+        # Add a Total Row at the bottom
+        yield ['', '', '', 'TOTAL SALES:', '', f"₱{total_sales_sum:,.2f}"]
 
 
 class DebugExportView(APIView):
@@ -8,7 +8,7 @@ django.setup()
 from datetime import datetime, timedelta, date
 from decimal import Decimal
 import random
-from django.db import models, transaction
+from django.db import connection, models, transaction
 from django.utils import timezone
 from accounts.models import User, AuditLog
 from inventory.models import Category, Supplier, Product, InventoryMovement, LowStockAlert
@@ -20,6 +20,25 @@ from forecasting.models import (
 from reports.models import ReportSchedule, ReportExport, DashboardMetric
 
 
+def copy_insert(model, objs):
+    """Insert objs with PostgreSQL COPY, assigning their ids from the table's sequence first"""
+    table = model._meta.db_table
+    fields = model._meta.concrete_fields
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)",
+            [table, model._meta.pk.column, len(objs)]
+        )
+        for obj, (pk,) in zip(objs, cursor.fetchall()):
+            obj.pk = pk
+        
+        columns = ', '.join(quote(f.column) for f in fields)
+        with cursor.copy(f"COPY {quote(table)} ({columns}) FROM STDIN") as copy:
+            for obj in objs:
+                copy.write_row([f.get_db_prep_save(getattr(obj, f.attname), connection) for f in fields])
+
+
 print("Starting seed data generation...")
 
 # Clear existing data (optional - comment out if you want to keep existing data)
@@ -174,25 +193,32 @@ for prod_data in products_data:
 
 print("Creating low stock alerts...")
 # Create low stock alerts for products below reorder level
-for product in Product.objects.all():
-    if product.is_low_stock:
-        LowStockAlert.objects.create(
-            product=product,
-            current_stock=product.current_stock,
-            reorder_level=product.reorder_level,
-            status='PENDING'
-        )
+LowStockAlert.objects.bulk_create([
+    LowStockAlert(
+        product=product,
+        current_stock=product.current_stock,
+        reorder_level=product.reorder_level,
+        status='PENDING'
+    )
+    for product in Product.objects.filter(current_stock__lte=models.F('reorder_level'))
+])
 
 print("Creating sales transactions...")
 # Create sales transactions for the past 30 days
 print("Importing sales from CSV...")
 csv_file_path = os.path.join(os.path.dirname(__file__), 'seed_data_90_days.csv')
 
+# Look products up by name in memory instead of one query per CSV row
+product_by_name = {p.name: p for p in products.values()}
+
 transaction_count = 0
 transaction_dates = set()
+sales = []
+sale_items = []
+sequence_by_date = {}
 try:
     print("Reading CSV and importing transactions (Atomic)...")
-    with transaction.atomic(), open(csv_file_path, 'r', encoding='utf-8') as f:
+    with open(csv_file_path, 'r', encoding='utf-8') as f:
         reader = csv.DictReader(f)
         
         # Group rows by date to potentially create multi-item transactions if we wanted, 
@@ -217,9 +243,8 @@ try:
             trans_datetime = timezone.make_aware(trans_datetime)
             
             # Find product
-            try:
-                product = Product.objects.get(name=product_name)
-            except Product.DoesNotExist:
+            product = product_by_name.get(product_name)
+            if not product:
                 print(f"Warning: Product '{product_name}' not found. Skipping.")
                 continue
                 
@@ -229,8 +254,12 @@ try:
             # Calculate totals
             line_total = price * quantity
             
-            # Create transaction
-            transaction = SalesTransaction.objects.create(
+            # bulk_create skips save(), so number the transaction per sale date here
+            sequence_by_date[trans_date] = sequence_by_date.get(trans_date, 0) + 1
+            
+            # Build transaction (inserted in batches below)
+            sale = SalesTransaction(
+                transaction_number=f"TXN-{trans_date.strftime('%Y%m%d')}-{sequence_by_date[trans_date]:04d}",
                 subtotal=line_total,
                 tax=Decimal('0.00'), # Assuming price includes tax or no tax for simplicity as per dataset
                 discount=Decimal('0.00'),
@@ -243,25 +272,34 @@ try:
                 created_at=trans_datetime,
                 completed_at=trans_datetime
             )
+            sales.append(sale)
             
-            # Manually set created_at because auto_now_add might override it?
-            # actually auto_now_add=True in model usually prevents setting it.
-            # We might need to update it after creation if the model has auto_now_add=True.
-            # Let's check model definition if possible, or just update it.
-            SalesTransaction.objects.filter(id=transaction.id).update(created_at=trans_datetime, completed_at=trans_datetime)
-            
-            TransactionItem.objects.create(
-                transaction=transaction,
+            sale_items.append(TransactionItem(
+                transaction=sale,
                 product=product,
                 quantity=quantity,
                 unit_price=price,
-                discount=Decimal('0.00')
-            )
+                discount=Decimal('0.00'),
+                line_total=line_total
+            ))
             
             transaction_count += 1
             
             if transaction_count % 100 == 0:
                 print(f"Processed {transaction_count} transactions...")
+    
+    with transaction.atomic():
+        if connection.vendor == 'postgresql':
+            # COPY doesn't run auto_now, so fill updated_at as well
+            for sale in sales:
+                sale.updated_at = sale.created_at
+            copy_insert(SalesTransaction, sales)
+            for item in sale_items:
+                item.transaction_id = item.transaction.pk
+            copy_insert(TransactionItem, sale_items)
+        else:
+            SalesTransaction.objects.bulk_create(sales, batch_size=500)
+            TransactionItem.objects.bulk_create(sale_items, batch_size=500)
 
 except FileNotFoundError:
     print(f"Error: Could not find {csv_file_path}")
@@ -350,6 +388,8 @@ forecast_model = ForecastModel.objects.create(
 
 print("Creating product forecasts...")
 # Create forecasts for next 7 days
+product_forecasts = []
+latest_forecast_by_product = {}
 for product in Product.objects.all()[:10]:  # Forecast for first 10 products
     base_demand = product.current_stock // 5  # Base daily demand
     
@@ -360,7 +400,7 @@ for product in Product.objects.all()[:10]:  # Forecast for first 10 products
         predicted = base_demand + random.randint(-2, 5)
         predicted = max(1, predicted)
         
-        ProductForecast.objects.create(
+        forecast = ProductForecast(
             product=product,
             forecast_model=forecast_model,
             forecast_date=forecast_date,
@@ -371,13 +411,17 @@ for product in Product.objects.all()[:10]:  # Forecast for first 10 products
             is_peak_season=False,
             seasonal_factor=1.0
         )
+        product_forecasts.append(forecast)
+        # Forecasts are ordered by -forecast_date, so the furthest-out one is the "latest"
+        latest_forecast_by_product[product.id] = forecast
+
+ProductForecast.objects.bulk_create(product_forecasts)
 
 print("Creating stock recommendations...")
 # Create stock recommendations for low stock items
+stock_recommendations = []
 for product in Product.objects.filter(current_stock__lte=models.F('reorder_level'))[:5]:
-    latest_forecast = product.forecasts.filter(
-        forecast_date__gte=date.today()
-    ).first()
+    latest_forecast = latest_forecast_by_product.get(product.id)
     
     if latest_forecast:
         recommended_qty = latest_forecast.recommended_stock - product.current_stock
@@ -385,7 +429,7 @@ for product in Product.objects.filter(current_stock__lte=models.F('reorder_level
         if recommended_qty > 0:
             priority = 'URGENT' if product.current_stock < 5 else 'HIGH'
             
-            StockRecommendation.objects.create(
+            stock_recommendations.append(StockRecommendation(
                 product=product,
                 forecast=latest_forecast,
                 current_stock=product.current_stock,
@@ -394,7 +438,9 @@ for product in Product.objects.filter(current_stock__lte=models.F('reorder_level
                        f'Forecasted demand: {latest_forecast.predicted_demand} units.',
                 priority=priority,
                 status='PENDING'
-            )
+            ))
+
+StockRecommendation.objects.bulk_create(stock_recommendations)
 
 print("Creating report schedules...")
 # Create report schedules
@@ -435,9 +481,9 @@ if not transaction_dates:
     for days_ago in range(30, 0, -1):
         transaction_dates.add(date.today() - timedelta(days=days_ago))
 
-for metric_date in sorted(transaction_dates):
-    print(f"Generating metrics for {metric_date}...")
-    DashboardMetric.generate_for_date(metric_date)
+# One grouped pass over the whole range instead of a round of aggregates per date
+print(f"Generating metrics for {min(transaction_dates)} to {max(transaction_dates)}...")
+DashboardMetric.generate_for_range(min(transaction_dates), max(transaction_dates))
 
 print("Creating audit logs...")
 # Create some audit logs
@@ -0,0 +1,297 @@
+"""
+Tests for the report exports: data builder query counts and queued export jobs
+"""
+
+import pytest
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from inventory.models import Category, Supplier, Product
+from pos.models import SalesTransaction, TransactionItem
+from reports.models import ReportExport
+from reports import tasks
+from reports.tasks import generate_report_export
+from reports.views import SimpleReportExport
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+class TestSalesExportQueries:
+    """The sales export must not issue per-transaction or per-item queries"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Setup test data"""
+        self.staff = User.objects.create_user(
+            username='staff',
+            email='staff@test.com',
+            full_name='Test Staff',
+            password='testpass123',
+            role='STAFF'
+        )
+
+        category = Category.objects.create(name='Test Roses', description='Test category')
+        supplier = Supplier.objects.create(name='Test Supplier', phone='09171234567', email='supplier@test.com')
+        self.product = Product.objects.create(
+            sku='TEST-001',
+            name='Red Rose Bouquet',
+            category=category,
+            supplier=supplier,
+            unit_price=500.00,
+            cost_price=300.00,
+            current_stock=100,
+            reorder_level=10,
+            is_active=True,
+            created_by=self.staff
+        )
+
+    def create_sales(self, count):
+        for _ in range(count):
+            transaction = SalesTransaction.objects.create(
+                subtotal=500.00,
+                total_amount=500.00,
+                payment_method='CASH',
+                amount_paid=500.00,
+                status='COMPLETED',
+                created_by=self.staff
+            )
+            TransactionItem.objects.create(
+                transaction=transaction,
+                product=self.product,
+                quantity=1,
+                unit_price=500.00
+            )
+
+    def count_export_queries(self):
+        now = timezone.now()
+        with CaptureQueriesContext(connection) as ctx:
+            data = list(SimpleReportExport().get_report_data('sales', now - timedelta(days=1), now + timedelta(days=1)))
+        return len(ctx.captured_queries), data
+
+    def test_query_count_is_constant(self):
+        """Test that adding transactions doesn't add queries"""
+        self.create_sales(1)
+        single_count, single_data = self.count_export_queries()
+
+        self.create_sales(4)
+        many_count, many_data = self.count_export_queries()
+
+        # Header + rows + TOTAL row
+        assert len(single_data) == 1 + 1 + 1
+        assert len(many_data) == 1 + 5 + 1
+        assert many_count == single_count
+
+
+@pytest.mark.django_db
+class TestQueuedReportExport:
+    """Test queuing an export and the background job that renders it"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        """Setup test data"""
+        settings.MEDIA_ROOT = tmp_path
+        self.owner = User.objects.create_user(
+            username='owner',
+            email='owner@test.com',
+            full_name='Test Owner',
+            password='testpass123',
+            role='OWNER'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.owner)
+
+    def create_export(self, export_format='CSV', **kwargs):
+        return ReportExport.objects.create(
+            report_type='sales',
+            export_format=export_format,
+            created_by=self.owner,
+            **kwargs
+        )
+
+    def test_export_is_queued(self, django_capture_on_commit_callbacks, monkeypatch):
+        """Test that the request returns 202 and queues rendering on the export worker after commit"""
+        submitted = []
+        monkeypatch.setattr(tasks.EXPORT_EXECUTOR, 'submit', lambda fn, *args: submitted.append((fn, args)))
+        with django_capture_on_commit_callbacks(execute=True) as callbacks:
+            response = self.client.post('/api/reports/export/', {
+                'report_type': 'Sales',
+                'export_format': 'CSV',
+                'filters': {'selected_days': ['Monday', 'tuesday', 4]},
+            }, format='json')
+
+        assert response.status_code == status.HTTP_202_ACCEPTED
+        assert len(callbacks) == 1
+        export = ReportExport.objects.get(pk=response.data['export']['id'])
+        assert export.status == 'PENDING'
+        assert export.report_type == 'sales'
+        assert export.filters == {'selected_days': [0, 1, 4]}
+        assert response.data['status_url'].endswith(f'/api/reports/exports/{export.id}/')
+        assert submitted == [(tasks.run_report_export, (export.id,))]
+
+    @pytest.mark.parametrize('payload', [
+        {'report_type': 'sales', 'export_format': 'EXCEL'},
+        {'report_type': 'sales', 'export_format': 'CSV', 'filters': {'selected_days': ['Funday']}},
+        {'report_type': 'sales', 'export_format': 'CSV', 'filters': {'selected_days': [7]}},
+        {'report_type': 'sales', 'export_format': 'CSV', 'filters': ['Monday']},
+        {'report_type': 'customers', 'export_format': 'CSV'},
+        {'report_type': 'sales', 'export_format': 'CSV', 'start_date': '2026-10-02', 'end_date': '2026-10-01'},
+    ])
+    def test_invalid_export_request(self, payload):
+        """Test that unsupported formats/report types, bad weekdays and reversed dates are rejected up front"""
+        response = self.client.post('/api/reports/export/', payload, format='json')
+
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert not ReportExport.objects.exists()
+
+    @pytest.mark.parametrize('export_format,extension', [('CSV', 'csv'), ('PDF', 'pdf')])
+    def test_export_job_writes_file(self, export_format, extension):
+        """Test that the job stores the file under a name matching its format"""
+        export = self.create_export(export_format, filters={'selected_days': [0, 1]})
+
+        generate_report_export(export.id)
+
+        export.refresh_from_db()
+        assert export.status == 'COMPLETED'
+        assert export.file_path == f'exports/sales_{export.id}.{extension}'
+        assert export.file_size == default_storage.size(export.file_path)
+        assert export.started_at is not None
+        assert export.completed_at is not None
+
+    def test_export_job_failure(self, monkeypatch):
+        """Test that an error while rendering marks the export FAILED"""
+        def fail(*args, **kwargs):
+            raise ValueError('render failed')
+        monkeypatch.setattr(SimpleReportExport, 'generate_csv', fail)
+        export = self.create_export()
+
+        generate_report_export(export.id)
+
+        export.refresh_from_db()
+        assert export.status == 'FAILED'
+        assert export.error_message == 'render failed'
+        assert export.file_path == ''
+
+    def test_export_job_skips_failed_export(self):
+        """Test that a job reported FAILED while it waited in the queue isn't rendered"""
+        export = self.create_export(status='FAILED')
+
+        generate_report_export(export.id)
+
+        export.refresh_from_db()
+        assert export.status == 'FAILED'
+        assert export.started_at is None
+        assert export.file_path == ''
+
+    def test_stale_pending_export_reported_failed(self):
+        """Test that an export whose worker died stops reporting PENDING"""
+        export = self.create_export()
+        ReportExport.objects.filter(pk=export.id).update(
+            created_at=timezone.now() - ReportExport.STALE_AFTER - timedelta(minutes=1)
+        )
+
+        response = self.client.get(f'/api/reports/exports/{export.id}/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['status'] == 'FAILED'
+        assert response.data['file_url'] is None
+        export.refresh_from_db()
+        assert export.status == 'FAILED'
+
+
+@pytest.mark.django_db
+class TestReportExportStatus:
+    """Test polling a queued export and downloading its file"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, settings, tmp_path):
+        """Setup test data"""
+        settings.MEDIA_ROOT = tmp_path
+        self.owner = User.objects.create_user(
+            username='owner',
+            email='owner@test.com',
+            full_name='Test Owner',
+            password='testpass123',
+            role='OWNER'
+        )
+        self.staff = User.objects.create_user(
+            username='staff',
+            email='staff@test.com',
+            full_name='Test Staff',
+            password='testpass123',
+            role='STAFF'
+        )
+        self.export = ReportExport.objects.create(
+            report_type='sales',
+            export_format='CSV',
+            created_by=self.owner
+        )
+        self.url = f'/api/reports/exports/{self.export.id}/'
+
+    def get_as(self, user, url=None):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        return client.get(url or self.url)
+
+    def complete_export(self, content=b'SALES REPORT\r\n'):
+        self.export.file_path = default_storage.save(f'exports/sales_{self.export.id}.csv', ContentFile(content))
+        self.export.status = 'COMPLETED'
+        self.export.completed_at = timezone.now()
+        self.export.save(update_fields=['file_path', 'status', 'completed_at'])
+
+    def test_owner_reads_pending_export(self):
+        """Test that the creator can poll the export before it finishes"""
+        response = self.get_as(self.owner)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['id'] == self.export.id
+        assert response.data['status'] == 'PENDING'
+        assert response.data['file_url'] is None
+
+    def test_other_user_gets_404(self):
+        """Test that exports are only visible to the user who requested them"""
+        response = self.get_as(self.staff)
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_file_url_once_completed(self):
+        """Test that file_url points at the authenticated download once COMPLETED"""
+        self.export.file_path = f'exports/sales_{self.export.id}.csv'
+        self.export.save(update_fields=['file_path'])
+        assert self.get_as(self.owner).data['file_url'] is None
+
+        self.complete_export()
+
+        response = self.get_as(self.owner)
+        assert response.data['status'] == 'COMPLETED'
+        assert response.data['file_url'] == f'http://testserver/api/reports/exports/{self.export.id}/download/'
+
+    def test_owner_downloads_file(self):
+        """Test that the creator gets the stored file as an attachment"""
+        self.complete_export()
+
+        response = self.get_as(self.owner, f'{self.url}download/')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert b''.join(response.streaming_content) == b'SALES REPORT\r\n'
+        assert f'filename="sales_{self.export.id}.csv"' in response['Content-Disposition']
+
+    def test_download_is_private(self):
+        """Test that other users and anonymous clients can't fetch the file"""
+        self.complete_export()
+
+        assert self.get_as(self.staff, f'{self.url}download/').status_code == status.HTTP_404_NOT_FOUND
+        assert APIClient().get(f'{self.url}download/').status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_download_before_completed(self):
+        """Test that there is nothing to download while the export is PENDING"""
+        response = self.get_as(self.owner, f'{self.url}download/')
+
+        assert response.status_code == status.HTTP_404_NOT_FOUND
@@ -0,0 +1,347 @@
+"""
+Behavior tests for the report views
+"""
+
+import pytest
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from inventory.models import Category, Supplier, Product
+from pos.models import SalesTransaction, TransactionItem
+from reports.models import DashboardMetric
+from reports.views import PERIOD_RESOLVERS
+
+User = get_user_model()
+
+
+@pytest.fixture
+def owner():
+    return User.objects.create_user(
+        username='owner',
+        email='owner@test.com',
+        full_name='Test Owner',
+        password='testpass123',
+        role='OWNER'
+    )
+
+
+@pytest.fixture
+def product(owner):
+    category = Category.objects.create(name='Test Roses', description='Test category')
+    supplier = Supplier.objects.create(name='Test Supplier', phone='09171234567', email='supplier@test.com')
+    return Product.objects.create(
+        sku='TEST-001',
+        name='Red Rose Bouquet',
+        category=category,
+        supplier=supplier,
+        unit_price=500.00,
+        cost_price=300.00,
+        current_stock=100,
+        reorder_level=10,
+        is_active=True,
+        created_by=owner
+    )
+
+
+@pytest.fixture
+def owner_client(owner):
+    client = APIClient()
+    client.force_authenticate(user=owner)
+    return client
+
+
+def create_sale(user, product, quantity=2, status='COMPLETED', created_at=None):
+    """Create a single-item sale at the product's unit price"""
+    total = Decimal(str(product.unit_price)) * quantity
+    extra = {'created_at': created_at} if created_at else {}
+    sale = SalesTransaction.objects.create(
+        subtotal=total,
+        total_amount=total,
+        payment_method='CASH',
+        amount_paid=total,
+        status=status,
+        created_by=user,
+        **extra
+    )
+    TransactionItem.objects.create(
+        transaction=sale,
+        product=product,
+        quantity=quantity,
+        unit_price=product.unit_price
+    )
+    return sale
+
+
+@pytest.mark.django_db
+class TestProfitLossReport:
+    """Test the profit & loss report with sales in the period"""
+
+    def test_profit_loss_with_sales(self, owner, product, owner_client):
+        """Test totals and the per-product breakdown"""
+        create_sale(owner, product, quantity=2)
+        create_sale(owner, product, quantity=2)
+        # Voided sales are not counted
+        create_sale(owner, product, quantity=5, status='VOID')
+
+        response = owner_client.get('/api/reports/profit-loss/?period=month')
+        assert response.status_code == status.HTTP_200_OK
+
+        assert Decimal(response.data['net_sales']) == Decimal('2000.00')
+        assert Decimal(response.data['cost_of_goods_sold']) == Decimal('1200.00')
+        assert Decimal(response.data['gross_profit']) == Decimal('800.00')
+
+        products = response.data['profit_by_product']
+        assert len(products) == 1
+        assert products[0]['product'] == 'Red Rose Bouquet'
+        assert products[0]['quantity'] == 4
+        assert products[0]['revenue'] == 2000.0
+        assert products[0]['cost'] == 1200.0
+        assert products[0]['profit'] == 800.0
+
+        categories = response.data['profit_by_category']
+        assert [c['category'] for c in categories] == ['Test Roses']
+        assert categories[0]['profit'] == 800.0
+
+
+class TestPeriodResolvers:
+    """Test the period -> date range resolvers"""
+
+    today = date(2026, 10, 16)
+
+    @pytest.mark.parametrize('year', [0, 10000, '-1', 'abc', None])
+    def test_year_out_of_range_falls_back_to_current_year(self, year):
+        """Test that an invalid year doesn't raise"""
+        assert PERIOD_RESOLVERS['year'](self.today, None, year) == (date(2026, 1, 1), date(2026, 12, 31))
+
+    def test_year_selected(self):
+        """Test that a valid year is used as-is"""
+        assert PERIOD_RESOLVERS['year'](self.today, None, '2024') == (date(2024, 1, 1), date(2024, 12, 31))
+
+    def test_day(self):
+        assert PERIOD_RESOLVERS['day'](self.today, None, None) == (self.today, self.today)
+
+    def test_week_spans_month_boundary(self):
+        """Test that the week runs Monday to Sunday even across months"""
+        assert PERIOD_RESOLVERS['week'](date(2026, 10, 1), None, None) == (date(2026, 9, 28), date(2026, 10, 4))
+
+    @pytest.mark.parametrize('month,year,expected', [
+        ('12', '2025', (date(2025, 12, 1), date(2025, 12, 31))),
+        ('2', '2024', (date(2024, 2, 1), date(2024, 2, 29))),
+        ('2', '2026', (date(2026, 2, 1), date(2026, 2, 28))),
+        # Invalid selections fall back to the current month
+        ('13', '2026', (date(2026, 10, 1), date(2026, 10, 31))),
+        (None, None, (date(2026, 10, 1), date(2026, 10, 31))),
+    ])
+    def test_month(self, month, year, expected):
+        assert PERIOD_RESOLVERS['month'](self.today, month, year) == expected
+
+    @pytest.mark.django_db
+    def test_all_time_without_sales(self):
+        """Test that all-time starts at the beginning of this year when there are no sales"""
+        assert PERIOD_RESOLVERS['all'](self.today, None, None) == (date(2026, 1, 1), self.today)
+
+
+@pytest.mark.django_db
+class TestDashboardMetricRefresh:
+    """Stored dashboard history must follow status changes on past sales"""
+
+    def test_voiding_past_sale_regenerates_metric(self, owner, product):
+        """Test that voiding a sale from a closed day updates that day's row"""
+        sale_time = timezone.now() - timedelta(days=3)
+        sale = create_sale(owner, product, quantity=2, created_at=sale_time)
+        day = timezone.localdate(sale_time)
+        DashboardMetric.generate_for_date(day)
+        assert DashboardMetric.objects.get(date=day).daily_transactions == 1
+
+        sale = SalesTransaction.objects.get(pk=sale.pk)
+        sale.status = 'VOID'
+        sale.save()
+
+        metric = DashboardMetric.objects.get(date=day)
+        assert metric.daily_transactions == 0
+        assert metric.daily_sales == 0
+        assert metric.daily_profit == 0
+
+    def test_deleting_past_sale_regenerates_metric(self, owner, product):
+        """Test that deleting a sale from a closed day updates that day's row"""
+        sale_time = timezone.now() - timedelta(days=3)
+        sale = create_sale(owner, product, quantity=2, created_at=sale_time)
+        day = timezone.localdate(sale_time)
+        DashboardMetric.generate_for_date(day)
+
+        sale.delete()
+
+        assert DashboardMetric.objects.get(date=day).daily_transactions == 0
+
+    def test_status_change_keeps_inventory_snapshot(self, owner, product):
+        """Test that regenerating a past day doesn't overwrite its stock levels"""
+        sale_time = timezone.now() - timedelta(days=3)
+        sale = create_sale(owner, product, quantity=2, created_at=sale_time)
+        day = timezone.localdate(sale_time)
+        DashboardMetric.generate_for_date(day)
+        Product.objects.filter(pk=product.pk).update(current_stock=0)
+
+        sale = SalesTransaction.objects.get(pk=sale.pk)
+        sale.status = 'VOID'
+        sale.save()
+
+        metric = DashboardMetric.objects.get(date=day)
+        assert metric.out_of_stock_count == 0
+        assert metric.inventory_value == Decimal('30000.00')
+
+    def test_status_change_without_stored_metric_creates_none(self, owner, product):
+        """Test that days without a stored row are left to the live fallback"""
+        sale = create_sale(owner, product, created_at=timezone.now() - timedelta(days=3))
+        sale = SalesTransaction.objects.get(pk=sale.pk)
+        sale.status = 'REFUNDED'
+        sale.save()
+
+        assert not DashboardMetric.objects.exists()
+
+
+@pytest.mark.django_db
+class TestDashboardCache:
+    """The cached dashboard must not outlive edits to the rows it summarizes"""
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self):
+        cache.clear()
+        yield
+        cache.clear()
+
+    def test_voiding_sale_refreshes_dashboard(self, owner, product, owner_client):
+        """Test that a status change on an existing sale changes the cache key"""
+        sale = create_sale(owner, product)
+        assert owner_client.get('/api/reports/dashboard/').data['today_transactions'] == 1
+
+        sale.status = 'VOID'
+        sale.save()
+
+        assert owner_client.get('/api/reports/dashboard/').data['today_transactions'] == 0
+
+    def test_editing_product_refreshes_dashboard(self, owner, product, owner_client):
+        """Test that a product edit without a stock movement changes the cache key"""
+        assert owner_client.get('/api/reports/dashboard/').data['total_products'] == 1
+
+        product.is_active = False
+        product.save()
+
+        assert owner_client.get('/api/reports/dashboard/').data['total_products'] == 0
+
+
+@pytest.mark.django_db
+class TestSalesAnalytics:
+    """Test the bucketed sales trend and the optional recent transactions page"""
+
+    def local_today_at(self, hour, minute=0):
+        return timezone.make_aware(datetime.combine(timezone.localdate(), time(hour, minute)))
+
+    def test_day_buckets_by_local_hour(self, owner, product, owner_client):
+        """Test that the day view has 24 hourly buckets in local time"""
+        create_sale(owner, product, quantity=1, created_at=self.local_today_at(9, 30))
+        create_sale(owner, product, quantity=2, created_at=self.local_today_at(9, 45))
+        create_sale(owner, product, quantity=1, created_at=self.local_today_at(14, 10))
+        create_sale(owner, product, quantity=1, status='VOID', created_at=self.local_today_at(15))
+
+        response = owner_client.get('/api/reports/sales-summary/?period=day')
+
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data['grouping'] == 'hourly'
+        assert response.data['total_transactions'] == 3
+        trend = response.data['daily_trend']
+        assert len(trend) == 24
+        assert trend[9] == {'day': '09:00', 'label': '09:00', 'total': 1500.0, 'count': 2}
+        assert trend[14]['count'] == 1
+        assert trend[15]['count'] == 0
+        assert 'transactions' not in response.data
+
+    def test_week_buckets_by_weekday(self, owner, product, owner_client):
+        """Test that the week view has one bucket per weekday, Monday first"""
+        create_sale(owner, product, quantity=1, status='PENDING', created_at=self.local_today_at(10))
+
+        trend = owner_client.get('/api/reports/sales-summary/?period=week').data['daily_trend']
+
+        today = timezone.localdate()
+        assert [row['label'] for row in trend] == ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+        assert trend[today.weekday()]['day'] == today.isoformat()
+        assert trend[today.weekday()]['total'] == 500.0
+        assert sum(row['count'] for row in trend) == 1
+
+    def test_month_buckets_by_day_up_to_today(self, owner, product, owner_client):
+        """Test that the month view has one bucket per day so far"""
+        create_sale(owner, product, quantity=2, created_at=self.local_today_at(10))
+
+        trend = owner_client.get('/api/reports/sales-summary/?period=month').data['daily_trend']
+
+        today = timezone.localdate()
+        assert len(trend) == today.day
+        assert trend[-1] == {'day': today.isoformat(), 'label': str(today.day), 'total': 1000.0, 'count': 1}
+
+    def test_year_buckets_by_month(self, owner, product, owner_client):
+        """Test that the year view has twelve monthly buckets"""
+        create_sale(owner, product, quantity=1, created_at=self.local_today_at(10))
+
+        trend = owner_client.get('/api/reports/sales-summary/?period=year').data['daily_trend']
+
+        today = timezone.localdate()
+        assert len(trend) == 12
+        assert trend[today.month - 1]['total'] == 500.0
+        assert sum(row['count'] for row in trend) == 1
+
+    def test_include_recent_is_paginated(self, owner, product, owner_client):
+        """Test that recent transactions come back one page at a time"""
+        for hour in (9, 10, 11):
+            create_sale(owner, product, quantity=1, created_at=self.local_today_at(hour))
+
+        response = owner_client.get('/api/reports/sales-summary/?period=day&include_recent=true&page_size=2')
+
+        recent = response.data['transactions']
+        assert recent['count'] == 3
+        assert len(recent['results']) == 2
+        assert recent['next'] is not None
+        assert recent['previous'] is None
+        # Newest first
+        assert recent['results'][0]['created_at'] > recent['results'][1]['created_at']
+
+        response = owner_client.get(recent['next'])
+        assert len(response.data['transactions']['results']) == 1
+
+
+@pytest.mark.django_db
+class TestDashboardMetricGeneration:
+    """Test the grouped DashboardMetric generation"""
+
+    def test_generate_for_range_upserts(self, owner, product):
+        """Test that regenerating a range updates the existing rows instead of duplicating them"""
+        day = timezone.localdate() - timedelta(days=3)
+        sale_time = timezone.make_aware(datetime.combine(day, time(10)))
+        create_sale(owner, product, quantity=2, created_at=sale_time)
+        create_sale(owner, product, quantity=1, status='VOID', created_at=sale_time)
+
+        DashboardMetric.generate_for_range(day - timedelta(days=1), day)
+        assert DashboardMetric.objects.count() == 2
+        metric = DashboardMetric.objects.get(date=day)
+        assert metric.daily_transactions == 1
+        assert metric.daily_sales == Decimal('1000.00')
+        assert metric.daily_profit == Decimal('400.00')
+        assert DashboardMetric.objects.get(date=day - timedelta(days=1)).daily_transactions == 0
+
+        create_sale(owner, product, quantity=1, status='PENDING', created_at=sale_time)
+        product.is_active = False
+        product.save()
+        DashboardMetric.generate_for_range(day - timedelta(days=1), day)
+
+        assert DashboardMetric.objects.count() == 2
+        updated = DashboardMetric.objects.get(date=day)
+        assert updated.pk == metric.pk
+        assert updated.daily_transactions == 2
+        assert updated.daily_sales == Decimal('1500.00')
+        assert updated.daily_profit == Decimal('600.00')
+        # The inventory snapshot taken when the row was created is kept
+        assert updated.total_products == 1
+        assert updated.inventory_value == metric.inventory_value
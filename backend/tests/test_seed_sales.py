@@ -0,0 +1,64 @@
+"""
+Tests for the seed_sales management command
+"""
+
+import pytest
+from io import StringIO
+from pathlib import Path
+from django.contrib.auth import get_user_model
+from datetime import timedelta
+from django.core.management import call_command
+from django.utils import timezone
+
+from pos.models import SalesTransaction
+from reports.models import DashboardMetric
+
+User = get_user_model()
+
+# seed_sales reads flowerbelle_sales_dataset.csv from the working directory
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.mark.django_db
+class TestSeedSales:
+    """Test that seeding is reproducible"""
+
+    @pytest.fixture(autouse=True)
+    def setup(self, monkeypatch):
+        """Setup test data"""
+        monkeypatch.chdir(BACKEND_DIR)
+        User.objects.create_user(
+            username='owner',
+            email='owner@test.com',
+            full_name='Test Owner',
+            password='testpass123',
+            role='OWNER'
+        )
+
+    def seed(self):
+        call_command('seed_sales', stdout=StringIO())
+        return list(SalesTransaction.objects.order_by('created_at').values_list(
+            'transaction_number', 'created_at', 'payment_reference', 'total_amount'
+        ))
+
+    def test_seed_is_deterministic(self):
+        """Test that two runs (seed 42) produce identical sale times and references"""
+        first = self.seed()
+        second = self.seed()
+
+        assert first
+        assert first == second
+
+    def test_seed_rebuilds_stored_dashboard_metrics(self):
+        """Test that stored dashboard days don't keep describing the replaced sales"""
+        old_day = timezone.localdate() - timedelta(days=200)
+        DashboardMetric.objects.create(date=old_day, daily_sales=1000, daily_transactions=5)
+
+        self.seed()
+
+        assert DashboardMetric.objects.get(date=old_day).daily_transactions == 0
+        yesterday = timezone.localdate() - timedelta(days=1)
+        stored = sum(DashboardMetric.objects.filter(
+            date__lte=yesterday
+        ).values_list('daily_transactions', flat=True))
+        assert stored == SalesTransaction.objects.filter(created_at__date__lte=yesterday).count()